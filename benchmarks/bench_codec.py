@@ -0,0 +1,56 @@
+"""
+Per-request decode + encode cost of each installed JSON backend.
+
+    python benchmarks/bench_codec.py
+"""
+import json
+import timeit
+
+from flask import Flask
+
+from flask_clova import codec
+
+from bench_models import intent_req
+
+
+response_wrapper = {
+    'version': '0.1.0',
+    'sessionAttributes': {'intent': 'ThrowDiceIntent', 'count': 3},
+    'response': {
+        'card': {},
+        'directives': [],
+        'outputSpeech': {
+            'type': 'SpeechList',
+            'values': [
+                {'type': 'PlainText', 'lang': 'ko', 'value': '주사위를 3개 던집니다.'},
+                {'type': 'URL', 'lang': '', 'value': 'https://example.com/rolling_dice_sound.mp3'},
+                {'type': 'PlainText', 'lang': 'ko', 'value': '결과는 1, 4, 6이며 합은 11입니다.'},
+            ]
+        },
+        'shouldEndSession': True,
+    }
+}
+
+
+def main(number=20000):
+    raw_body = json.dumps(intent_req).encode('utf-8')
+    app = Flask(__name__)
+
+    with app.app_context():
+        for name in ('json', 'ujson', 'orjson'):
+            try:
+                backend = codec._BACKENDS[name]()
+            except ImportError:
+                print('{:<8} not installed'.format(name))
+                continue
+
+            def request_cycle():
+                backend.loads(raw_body)
+                backend.dumps(response_wrapper)
+
+            best = min(timeit.Timer(request_cycle).repeat(repeat=5, number=number))
+            print('{:<8} {:8.3f} us/request'.format(name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
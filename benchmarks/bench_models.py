@@ -0,0 +1,98 @@
+"""
+Microbenchmark of models._Field against the former eager implementation.
+
+    python benchmarks/bench_models.py
+"""
+import timeit
+
+from flask_clova.models import _Field
+
+
+class _EagerField(dict):
+    """The previous _Field, which copied and wrapped the whole payload up front."""
+
+    def __init__(self, request_json={}):
+        super(_EagerField, self).__init__(request_json)
+        for key, value in request_json.items():
+            if isinstance(value, dict):
+                value = _EagerField(value)
+            self[key] = value
+
+    def __getattr__(self, attr):
+        return self.get(attr)
+
+    def __setattr__(self, key, value):
+        self.__setitem__(key, value)
+
+
+intent_req = {
+    "version": "0.1.0",
+    "session": {
+        "new": False,
+        "sessionAttributes": {"intent": "ThrowDiceIntent", "count": 3},
+        "sessionId": "a29cfead-c5ba-474d-8745-6c1a6625f0c5",
+        "user": {
+            "userId": "V0qe",
+            "accessToken": "XHapQasdfsdfFsdfasdflQQ7"
+        }
+    },
+    "context": {
+        "System": {
+            "application": {
+                "applicationId": "com.yourdomain.extension.pizzabot"
+            },
+            "user": {
+                "userId": "V0qe",
+                "accessToken": "XHapQasdfsdfFsdfasdflQQ7"
+            },
+            "device": {
+                "deviceId": "096e6b27-1717-33e9-b0a7-510a48658a9b",
+                "display": {
+                    "size": "l100",
+                    "orientation": "landscape",
+                    "dpi": 96,
+                    "contentLayer": {
+                        "width": 640,
+                        "height": 360
+                    }
+                }
+            }
+        }
+    },
+    "request": {
+        "type": "IntentRequest",
+        "intent": {
+            "name": "ThrowDiceIntent",
+            "slots": {
+                "diceCount": {
+                    "name": "diceCount",
+                    "value": "3"
+                }
+            }
+        }
+    }
+}
+
+
+def handle(field_cls, payload):
+    """Mirrors the accesses Clova makes for a typical IntentRequest."""
+    body = field_cls(payload)
+    request = body.request
+    session = body.session
+    session.new
+    session.sessionAttributes
+    body.context
+    for slot in request.intent.slots.values():
+        slot.get('name'), slot.get('value')
+    return request.type
+
+
+def main(number=100000):
+    for name, field_cls in (('eager _Field', _EagerField), ('lazy _Field', _Field)):
+        timer = timeit.Timer(lambda: handle(field_cls, intent_req))
+        best = min(timer.repeat(repeat=5, number=number))
+        print('{:<14} {:8.3f} us/request'.format(name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
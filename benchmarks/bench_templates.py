@@ -0,0 +1,73 @@
+"""
+Per-render cost of a yaml template with the previous loader and the current one.
+
+    python benchmarks/bench_templates.py
+"""
+import os
+import tempfile
+import timeit
+
+import yaml
+from flask import Flask, render_template
+from jinja2 import BaseLoader, ChoiceLoader, TemplateNotFound
+
+from flask_clova import Clova
+
+
+class _StatYamlLoader(BaseLoader):
+    """The previous YamlLoader, which stats the file on every lookup."""
+
+    def __init__(self, app, path):
+        self.path = app.root_path + os.path.sep + path
+        self.mapping = {}
+        self._reload_mapping()
+
+    def _reload_mapping(self):
+        if os.path.isfile(self.path):
+            self.last_mtime = os.path.getmtime(self.path)
+            with open(self.path) as f:
+                self.mapping = yaml.safe_load(f.read())
+
+    def get_source(self, environment, template):
+        if not os.path.isfile(self.path):
+            return None, None, None
+        if self.last_mtime != os.path.getmtime(self.path):
+            self._reload_mapping()
+        if template in self.mapping:
+            source = self.mapping[template]
+            return source, None, lambda: source == self.mapping.get(template)
+        raise TemplateNotFound(template)
+
+
+def make_app(root_path, loader_cls, auto_reload):
+    app = Flask(__name__, root_path=root_path)
+    app.config['TEMPLATES_AUTO_RELOAD'] = auto_reload
+    Clova(app=app, route='/')
+    if loader_cls is not None:
+        app.jinja_loader = ChoiceLoader([loader_cls(app, 'templates.yaml')])
+    return app
+
+
+def main(number=20000):
+    root_path = tempfile.mkdtemp()
+    with open(os.path.join(root_path, 'templates.yaml'), 'w') as f:
+        f.write('welcome: "{{ name }}님, 주사위 놀이에 오신 것을 환영합니다."\n')
+
+    cases = (
+        ('previous', _StatYamlLoader, False, None),
+        ('current', None, False, None),
+        ('previous', _StatYamlLoader, True, None),
+        ('current, reload every lookup', None, True, True),
+        ('current, reload every 5s', None, True, 5),
+    )
+    for name, loader_cls, auto_reload, template_reload in cases:
+        app = make_app(root_path, loader_cls, auto_reload)
+        app.config['CLOVA_TEMPLATE_RELOAD'] = template_reload
+        with app.app_context():
+            timer = timeit.Timer(lambda: render_template('welcome', name='클로바'))
+            best = min(timer.repeat(repeat=5, number=number))
+        print('auto_reload={!s:<5} {:<30} {:8.3f} us/render'.format(auto_reload, name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Cost of verifying the SignatureCEK header of a request, with and without the
+verified-digest cache.
+
+    python benchmarks/bench_verifier.py
+"""
+import base64
+import json
+import timeit
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from flask_clova.verifier import SignatureVerifier
+
+from bench_models import intent_req
+
+
+def main(number=2000):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+    pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    body = json.dumps(intent_req).encode('utf-8')
+    signature = base64.b64encode(private_key.sign(body, padding.PKCS1v15(), hashes.SHA256())).decode('ascii')
+
+    for name, cache_size in (('uncached', 0), ('cached', 1024)):
+        signature_verifier = SignatureVerifier(fetcher=lambda: pem, cache_size=cache_size)
+        signature_verifier.verify(body, signature)
+
+        timer = timeit.Timer(lambda: signature_verifier.verify(body, signature))
+        best = min(timer.repeat(repeat=5, number=number))
+        print('{:<9} {:8.3f} us/request'.format(name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
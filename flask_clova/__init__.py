@@ -28,4 +28,5 @@ from .speech import (
 
 from .directives import (
     directive,
+    AudioPlayer,
 )
@@ -0,0 +1,160 @@
+"""
+ASGI entry point for a Clova instance.
+
+    clova = Clova(app, '/clova')
+    asgi_app = ClovaASGI(clova)
+
+    # uvicorn module:asgi_app
+
+Each CEK request is handled in its own task, so `async def` handlers waiting
+on backends do not block other requests. Requests to other paths or with
+other methods are answered with 404 and 405. The request context is built from
+the ASGI scope, and runs the request hooks, error handlers and teardown functions
+of the app as under WSGI. Unhandled exceptions are answered with 500.
+Flask >= 2.2 keeps its contexts in contextvars, which isolates concurrent
+requests served on the same thread.
+"""
+import io
+import sys
+
+from flask.signals import request_started
+
+
+async def _read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+def _environ(scope, body):
+    """Returns the WSGI environ of an ASGI http scope and its request body."""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'] = client[0]
+        environ['REMOTE_PORT'] = str(client[1])
+
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').lower()
+        if name == 'content-length':
+            continue
+        key = 'CONTENT_TYPE' if name == 'content-type' else 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        environ[key] = environ[key] + ',' + value if key in environ else value
+    return environ
+
+
+class ClovaASGI(object):
+    """ASGI 3 application forwarding CEK requests to Clova's async dispatch path.
+
+    Arguments:
+        clova {Clova} -- Clova instance handling the requests
+
+    Keyword Arguments:
+        app {Flask object} -- App the handlers run in, required for blueprints (default: {clova.app})
+        route {str} -- path of the CEK endpoint, required for blueprints (default: {clova route})
+    """
+
+    def __init__(self, clova, app=None, route=None):
+        self.clova = clova
+        self.app = app if app is not None else clova.app
+        self.route = route if route is not None else clova._route
+
+        if self.app is None or self.route is None:
+            raise TypeError("app and route are required arguments when clova is initialized with a blueprint")
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['path'] != self.route:
+            await self._send(send, 404, [('Content-Type', 'text/plain')], b'Not Found')
+            return
+        if scope['method'] != 'POST':
+            await self._send(send, 405, [('Content-Type', 'text/plain'), ('Allow', 'POST')], b'Method Not Allowed')
+            return
+
+        ctx = self.app.request_context(_environ(scope, await _read_body(receive)))
+        error = None
+        ctx.push()
+        try:
+            try:
+                response = await self._full_dispatch()
+            except Exception as e:
+                error = e
+                try:
+                    response = self.app.handle_exception(e)
+                except Exception:
+                    # the app propagates exceptions, in debug and testing mode
+                    await self._send(send, 500, [('Content-Type', 'text/plain')], b'Internal Server Error')
+                    raise
+            body = response.get_data()
+        finally:
+            if self.app.should_ignore_error(error):
+                error = None
+            ctx.pop(error)
+
+        await self._send(send, response.status_code, response.headers.items(), body)
+
+    async def _full_dispatch(self):
+        """Same as Flask.full_dispatch_request, awaiting Clova's async view function:
+        runs the before and after request hooks, and the error handlers of the app.
+        """
+        request_started.send(self.app)
+        try:
+            rv = self.app.preprocess_request()
+            if rv is None:
+                rv = await self.clova._flask_view_func_async()
+        except Exception as e:
+            rv = self.app.handle_user_exception(e)
+        return self.app.finalize_request(rv)
+
+    @staticmethod
+    async def _send(send, status, headers, body):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(key.encode('latin-1'), value.encode('latin-1')) for key, value in headers],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': body,
+        })
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,260 @@
+"""
+Load-testing and benchmark suite for the CEK dispatch path.
+
+    python -m flask_clova.bench --requests 5000
+
+Generates realistic LaunchRequest, IntentRequest and SessionEndedRequest payloads
+with varied slots and session sizes, and drives them through a sample skill:
+
+- stages: calls each stage of the pipeline directly and reports its latency and
+  the memory it allocates per request: parse, verify, wrap, dispatch, render and encode.
+- client: posts the payloads with the Flask test client.
+- wsgi: posts the payloads over a keep-alive HTTP connection to a WSGI server running in-process.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import tracemalloc
+import http.client
+
+from flask import Flask, make_response
+from werkzeug.serving import make_server, WSGIRequestHandler
+
+from .core import Clova, request_state
+from .models import question, statement, _Response
+from .speech import say
+
+ROUTE = '/clova'
+APPLICATION_ID = 'com.example.extension.bench'
+STAGES = ('parse', 'verify', 'wrap', 'dispatch', 'render', 'encode')
+
+_INTENTS = (
+    ('ThrowDiceIntent', {'diceCount': lambda rnd: str(rnd.randint(1, 9))}),
+    ('OrderIntent', {'menu': lambda rnd: rnd.choice(['불고기', '페퍼로니', '콤비네이션']),
+                     'count': lambda rnd: rnd.choice(['한 개', '두 개', '세 개', '열두 개'])}),
+    ('Clova.GuideIntent', {}),
+)
+
+
+def generate_payloads(count, session_size=8, seed=0):
+    """Returns `count` encoded CEK requests, about 10% launches, 80% intents and 10% session ends.
+
+    Each session carries between 0 and `session_size` session attributes.
+    """
+    rnd = random.Random(seed)
+    payloads = []
+    for i in range(count):
+        roll = rnd.random()
+        if roll < 0.1:
+            request = {'type': 'LaunchRequest'}
+        elif roll < 0.9:
+            name, slots = rnd.choice(_INTENTS)
+            request = {
+                'type': 'IntentRequest',
+                'intent': {
+                    'name': name,
+                    'slots': {slot: {'name': slot, 'value': value(rnd)} for slot, value in slots.items()},
+                },
+            }
+        else:
+            request = {'type': 'SessionEndedRequest'}
+
+        attributes = {'key{}'.format(n): 'value ' * rnd.randint(1, 8) for n in range(rnd.randint(0, session_size))}
+        payloads.append(json.dumps({
+            'version': '0.1.0',
+            'session': {
+                'new': request['type'] == 'LaunchRequest',
+                'sessionId': 'session-{}'.format(i % 100),
+                'sessionAttributes': attributes,
+                'user': {'userId': 'user-{}'.format(i % 50), 'accessToken': 'token'},
+            },
+            'context': {
+                'System': {
+                    'application': {'applicationId': APPLICATION_ID},
+                    'user': {'userId': 'user-{}'.format(i % 50), 'accessToken': 'token'},
+                    'device': {
+                        'deviceId': '096e6b27-1717-33e9-b0a7-510a48658a9b',
+                        'display': {'size': 'l100', 'orientation': 'landscape', 'dpi': 96,
+                                    'contentLayer': {'width': 640, 'height': 360}},
+                    },
+                },
+            },
+            'request': request,
+        }, ensure_ascii=False).encode('utf-8'))
+    return payloads
+
+
+def make_app(json_backend=None):
+    """Returns a Flask app with a sample skill answering the generated payloads."""
+    app = Flask(__name__)
+    app.config['CLOVA_APPLICATION_ID'] = APPLICATION_ID
+    clova = Clova(app, ROUTE, json_backend=json_backend)
+
+    @clova.launch
+    def launch():
+        return question(say.Korean('몇 개의 주사위를 던질까요?')).reprompt(say.Korean('몇 개를 던질까요?'))
+
+    @clova.intent('ThrowDiceIntent', mapping={'count': 'diceCount'}, convert={'count': 'integer'}, default={'count': 1})
+    def throw_dice(count):
+        response = statement(say.Korean('주사위를 {}개 던집니다.'.format(count)))
+        response.add_speech(say.Link('https://example.com/rolling_dice_sound.mp3'))
+        return response.add_speech(say.Korean('결과는 {}입니다.'.format(count * 3)))
+
+    @clova.intent('OrderIntent', convert={'count': 'korean_number'})
+    def order(menu, count):
+        clova.session.sessionAttributes['order'] = [menu, count]
+        return question(say.Korean('{} {}판 주문할까요?'.format(menu, count)))
+
+    @clova.intent('Clova.GuideIntent', cache_response=True)
+    def guide():
+        return question(say.Korean('주사위 한 개 던져줘, 라고 시도해보세요.'))
+
+    @clova.session_ended
+    def session_ended():
+        return statement(say.Korean('종료합니다.'))
+
+    return app, clova
+
+
+def _run_stages(app, clova, raw_body):
+    """Runs one request through the pipeline stages, yielding after each one."""
+    with app.test_request_context(ROUTE, method='POST', data=raw_body):
+        request_state()
+        yield 'start'
+        clova._verify_signature(raw_body)
+        payload = clova._decode_request(raw_body)
+        yield 'parse'
+        clova._verify_application_id(payload)
+        yield 'verify'
+        clova._bind_request(payload)
+        yield 'wrap'
+        result = clova._select_view_func()()
+        yield 'dispatch'
+        if isinstance(result, _Response):
+            result = result.render_response()
+        yield 'render'
+        if isinstance(result, bytes):
+            clova._json_response(result)
+        else:
+            make_response(result).mimetype = 'application/json;charset=utf-8'
+        yield 'encode'
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def bench_stages(app, clova, payloads):
+    timings = {stage: [] for stage in STAGES}
+    for raw_body in payloads:
+        previous = time.perf_counter_ns()
+        for stage in _run_stages(app, clova, raw_body):
+            now = time.perf_counter_ns()
+            if stage != 'start':
+                timings[stage].append(now - previous)
+            previous = time.perf_counter_ns()
+
+    allocations = {stage: 0 for stage in STAGES}
+    tracemalloc.start()
+    try:
+        for raw_body in payloads:
+            for stage in _run_stages(app, clova, raw_body):
+                if stage != 'start':
+                    allocations[stage] += tracemalloc.get_traced_memory()[1] - baseline
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    print('{:<10} {:>10} {:>10} {:>14}'.format('stage', 'p50 us', 'p99 us', 'peak KiB/req'))
+    for stage in STAGES:
+        print('{:<10} {:>10.1f} {:>10.1f} {:>14.2f}'.format(
+            stage,
+            _percentile(timings[stage], 50) / 1000.0,
+            _percentile(timings[stage], 99) / 1000.0,
+            allocations[stage] / 1024.0 / len(payloads),
+        ))
+
+
+def _report(name, latencies, elapsed):
+    print('{:<10} p50 {:8.3f} ms   p99 {:8.3f} ms   {:8.0f} requests/sec'.format(
+        name,
+        _percentile(latencies, 50) / 1e6,
+        _percentile(latencies, 99) / 1e6,
+        len(latencies) / elapsed,
+    ))
+
+
+def bench_client(app, payloads):
+    latencies = []
+    with app.test_client() as client:
+        started = time.perf_counter()
+        for raw_body in payloads:
+            request_started = time.perf_counter_ns()
+            response = client.post(ROUTE, data=raw_body, content_type='application/json')
+            latencies.append(time.perf_counter_ns() - request_started)
+            assert response.status_code == 200, response.status
+        elapsed = time.perf_counter() - started
+    _report('client', latencies, elapsed)
+
+
+class _KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def bench_wsgi(app, payloads):
+    server = make_server('127.0.0.1', 0, app, request_handler=_KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    latencies = []
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port)
+    try:
+        started = time.perf_counter()
+        for raw_body in payloads:
+            request_started = time.perf_counter_ns()
+            connection.request('POST', ROUTE, body=raw_body, headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter_ns() - request_started)
+            assert response.status == 200, response.status
+        elapsed = time.perf_counter() - started
+    finally:
+        connection.close()
+        server.shutdown()
+    _report('wsgi', latencies, elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m flask_clova.bench', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=2000, help='number of requests per benchmark')
+    parser.add_argument('--session-size', type=int, default=8, help='maximum number of session attributes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json-backend', default=None, help="'orjson', 'ujson' or 'json'")
+    parser.add_argument('--mode', choices=('all', 'stages', 'client', 'wsgi'), default='all')
+    args = parser.parse_args(argv)
+
+    payloads = generate_payloads(args.requests, args.session_size, args.seed)
+    app, clova = make_app(args.json_backend)
+    with app.app_context():
+        print('{} requests, JSON backend: {}\n'.format(args.requests, clova.json_codec.name))
+
+    if args.mode in ('all', 'stages'):
+        bench_stages(app, clova, payloads)
+        print('')
+    if args.mode in ('all', 'client'):
+        bench_client(app, payloads)
+    if args.mode in ('all', 'wsgi'):
+        bench_wsgi(app, payloads)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Small in-process caches shared by flask_clova.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """Thread-safe, size bounded LRU cache with an optional time to live.
+
+    Keyword Arguments:
+        maxsize {int} -- maximum number of entries, the least recently used is evicted first (default: {1024})
+        ttl {float} -- seconds an entry stays valid, None to keep entries until evicted (default: {None})
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                return default
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def __len__(self):
+        return len(self._data)
+
+
+_missing = object()
@@ -0,0 +1,89 @@
+"""
+JSON codecs used to decode CEK requests and encode CEK responses.
+
+The codec is selected by the `json_backend` argument of Clova or the
+`CLOVA_JSON_BACKEND` setting, flask.json by default. orjson and ujson are
+optional; when the requested backend is not installed, the next available one is used.
+They accept the same values as flask.json: non-string keys are converted to strings,
+and other types they do not support are converted by the app's JSON provider.
+ujson still encodes Decimal values itself, as numbers.
+"""
+from flask import json
+
+from . import logger
+
+
+class FlaskJSONCodec(object):
+    """Codec backed by flask.json, which honours the app's JSON settings."""
+    name = 'json'
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+
+def _flask_default(obj):
+    """Converts a value the fast backends do not support, the way flask.json does."""
+    return json.loads(json.dumps(obj))
+
+
+class OrjsonCodec(object):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.loads = orjson.loads
+        self._dumps = orjson.dumps
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def dumps(self, obj):
+        return self._dumps(obj, default=_flask_default, option=self._options)
+
+
+class UjsonCodec(object):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self.loads = ujson.loads
+        self._dumps = ujson.dumps
+
+    def dumps(self, obj):
+        return self._dumps(obj, ensure_ascii=False, default=_flask_default).encode('utf-8')
+
+
+_BACKENDS = {
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+    'json': FlaskJSONCodec,
+    'flask': FlaskJSONCodec,
+    'stdlib': FlaskJSONCodec,
+}
+
+_FALLBACK_ORDER = ('orjson', 'ujson', 'json')
+
+
+def get_codec(name=None):
+    """Returns a codec for the backend `name`.
+
+    `None` or 'auto' picks the fastest installed backend. An unknown or
+    uninstalled backend falls back to the same order with a warning.
+    """
+    if name not in (None, 'auto'):
+        if name not in _BACKENDS:
+            logger.warning('Unknown JSON backend "{}", falling back.'.format(name))
+        else:
+            try:
+                return _BACKENDS[name]()
+            except ImportError:
+                logger.warning('JSON backend "{}" is not installed, falling back.'.format(name))
+
+    for fallback in _FALLBACK_ORDER:
+        try:
+            return _BACKENDS[fallback]()
+        except ImportError:
+            continue
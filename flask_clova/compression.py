@@ -0,0 +1,48 @@
+"""
+Compression of CEK response bodies.
+
+Enabled with the `CLOVA_COMPRESSION` setting: 'gzip', 'br', a list of both in order
+of preference, or True for brotli, when it is installed, then gzip. A body is only
+compressed above `CLOVA_COMPRESSION_MIN_SIZE` bytes and with an encoding the request
+accepts in its Accept-Encoding header.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _gzip(body):
+    return gzip.compress(body, 6)
+
+
+def _brotli(body):
+    return brotli.compress(body, quality=4)
+
+
+ENCODERS = {'gzip': _gzip}
+if brotli is not None:
+    ENCODERS['br'] = _brotli
+
+
+def encodings(setting):
+    """Returns the available encodings of a `CLOVA_COMPRESSION` setting, in order of preference."""
+    if not setting:
+        return ()
+    if setting is True:
+        setting = ('br', 'gzip')
+    elif isinstance(setting, str):
+        setting = (setting,)
+    return tuple(encoding for encoding in setting if encoding in ENCODERS)
+
+
+def compress(body, preferred, accept_encodings):
+    """Returns (encoding, compressed body) for the first preferred encoding the client accepts,
+    or (None, body).
+    """
+    for encoding in preferred:
+        if accept_encodings[encoding]:
+            return encoding, ENCODERS[encoding](body)
+    return None, body
@@ -0,0 +1,243 @@
+"""
+Built-in converters for CEK slot values.
+
+They can be given by name in the `convert` argument of @clova.intent:
+
+    @clova.intent('ThrowDiceIntent', convert={'dice_cnt': 'korean_number'})
+
+Converters are resolved when the intent is registered. Pure converters, whose result
+only depends on the slot value, are memoized, since the same slot values repeat
+constantly. Wrap your own converters with `pure` to memoize them too.
+"""
+import re
+import datetime
+from functools import lru_cache
+
+
+def pure(func=None, maxsize=1024):
+    """Memoizes a converter whose result only depends on the slot value.
+
+    Can be used as @pure or @pure(maxsize=...). Failed conversions are not memoized.
+    """
+    if func is None:
+        return lambda f: pure(f, maxsize)
+    return lru_cache(maxsize=maxsize)(func)
+
+
+_NATIVE_NUMBERS = {
+    '한': 1, '하나': 1, '두': 2, '둘': 2, '세': 3, '셋': 3, '석': 3, '서': 3,
+    '네': 4, '넷': 4, '넉': 4, '너': 4, '다섯': 5, '여섯': 6, '일곱': 7, '여덟': 8, '아홉': 9,
+    '열': 10, '스물': 20, '스무': 20, '서른': 30, '마흔': 40, '쉰': 50,
+    '예순': 60, '일흔': 70, '여든': 80, '아흔': 90,
+}
+_SINO_DIGITS = {
+    '영': 0, '공': 0, '일': 1, '이': 2, '삼': 3, '사': 4, '오': 5,
+    '육': 6, '륙': 6, '칠': 7, '팔': 8, '구': 9,
+}
+_SMALL_UNITS = {'십': 10, '백': 100, '천': 1000}
+_LARGE_UNITS = {'만': 10 ** 4, '억': 10 ** 8, '조': 10 ** 12}
+
+_NUMERAL_TOKENS = sorted(
+    list(_NATIVE_NUMBERS) + list(_SINO_DIGITS) + list(_SMALL_UNITS) + list(_LARGE_UNITS),
+    key=len, reverse=True
+)
+_DIGITS = re.compile(r'\d+')
+
+# words that may follow a number without a space, as in "3개" or "둘이서"
+_COUNTERS = frozenset([
+    '개', '번', '번째', '명', '분', '초', '시', '시간', '살', '세', '마리', '권', '장', '잔', '병', '대',
+    '곳', '층', '달', '개월', '년', '월', '일', '주', '주일', '원', '점', '배', '줄', '인분', '가지', '이서',
+])
+
+
+def _match_numeral(value, position, previous):
+    for token in _NUMERAL_TOKENS:
+        if value.startswith(token, position):
+            # only units follow digits, as in "2만", and a Sino-Korean digit after
+            # a native numeral starts the counter, as in "두 사람"
+            if isinstance(previous, int) and token not in _SMALL_UNITS and token not in _LARGE_UNITS:
+                return None
+            if token in _SINO_DIGITS and previous in _NATIVE_NUMBERS:
+                return None
+            return token
+    return None
+
+
+def _tokenize_number(value):
+    """Returns the numeral tokens at the start of value, the rest of value, and whether
+    the rest follows the numerals without a space.
+    """
+    tokens = []
+    position = 0
+    value = value.replace(',', '')
+    while position < len(value):
+        if value[position] == ' ':
+            position += 1
+            continue
+        digits = _DIGITS.match(value, position)
+        if digits is not None:
+            tokens.append(int(digits.group()))
+            position = digits.end()
+            continue
+        token = _match_numeral(value, position, tokens[-1] if tokens else None)
+        if token is None:
+            # the rest is a counter, as in "두 개" or "세 번"
+            break
+        tokens.append(token)
+        position += len(token)
+    glued = 0 < position < len(value) and value[position - 1] != ' '
+    return tokens, value[position:], glued
+
+
+@pure
+def korean_number(value):
+    """Converts native or Sino-Korean numerals, or digits, followed by an optional counter.
+
+    "한 개" -> 1, "열두 개" -> 12, "스물다섯" -> 25, "삼십오" -> 35, "이만 삼천" -> 23000, "3개" -> 3
+
+    Only known counters may follow numerals without a space, or digits at all, so words
+    such as "사람", "한국" or "12abc" are not numbers. Decimals such as "3.5" are rejected.
+    """
+    tokens, rest, glued = _tokenize_number(value)
+    if not tokens or rest.startswith('.'):
+        raise ValueError("Not a Korean number: {!r}".format(value))
+    if rest and (glued or isinstance(tokens[0], int)) and rest.split(None, 1)[0] not in _COUNTERS:
+        raise ValueError("Not a Korean number: {!r}".format(value))
+
+    total = 0
+    section = 0
+    pending = None
+    for token in tokens:
+        if isinstance(token, int):
+            pending = token if pending is None else int('{}{}'.format(pending, token))
+        elif token in _SINO_DIGITS:
+            digit = _SINO_DIGITS[token]
+            pending = digit if pending is None else pending * 10 + digit
+        elif token in _NATIVE_NUMBERS:
+            section += _NATIVE_NUMBERS[token]
+        elif token in _SMALL_UNITS:
+            section += (1 if pending is None else pending) * _SMALL_UNITS[token]
+            pending = None
+        else:
+            section += pending or 0
+            total += (section or 1) * _LARGE_UNITS[token]
+            section = 0
+            pending = None
+    return total + section + (pending or 0)
+
+
+@pure
+def integer(value):
+    """Converts digits or Korean numerals, with an optional counter, to an int.
+
+    Values starting with digits only fall back to Korean parsing when a counter follows them,
+    so "3.5", "1e3" or "12abc" are rejected like int() does.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return korean_number(value)
+
+
+_TRUE_VALUES = frozenset(['네', '예', '응', '어', '그래', '맞아', '좋아', 'yes', 'y', 'true', 'on', '1'])
+_FALSE_VALUES = frozenset(['아니', '아니요', '아니오', '아뇨', '싫어', 'no', 'n', 'false', 'off', '0'])
+
+
+@pure
+def boolean(value):
+    """Converts yes/no answers, in Korean or English, to a bool."""
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError("Not a boolean: {!r}".format(value))
+
+
+@pure
+def date(value):
+    """Converts a YYYY-MM-DD date slot to a datetime.date."""
+    return datetime.datetime.strptime(value.strip(), '%Y-%m-%d').date()
+
+
+_ISO_DURATION = re.compile(
+    r'^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$'
+)
+_KOREAN_DURATION = re.compile(r'(?P<number>[^시분초]+?)\s*(?P<unit>시간|분|초)(?P<half>\s*반)?')
+_KOREAN_DURATION_UNITS = {'시간': 'hours', '분': 'minutes', '초': 'seconds'}
+_DECIMAL = re.compile(r'^\d+\.\d+$')
+
+
+@pure
+def duration(value):
+    """Converts an ISO 8601 duration, "PT1H30M", or a Korean one, "한 시간 반", "10분 30초"
+    or "1.5시간", to a timedelta.
+    """
+    value = value.strip()
+    match = _ISO_DURATION.match(value)
+    if match is not None and any(match.groupdict().values()):
+        return datetime.timedelta(**{
+            unit: float(amount) for unit, amount in match.groupdict().items() if amount is not None
+        })
+
+    parts = {}
+    position = 0
+    for match in _KOREAN_DURATION.finditer(value):
+        if value[position:match.start()].strip():
+            break
+        unit = _KOREAN_DURATION_UNITS[match.group('unit')]
+        number = match.group('number').strip()
+        amount = float(number) if _DECIMAL.match(number) else korean_number(number)
+        if match.group('half'):
+            amount += 0.5
+        parts[unit] = parts.get(unit, 0) + amount
+        position = match.end()
+    if not parts or value[position:].strip():
+        raise ValueError("Not a duration: {!r}".format(value))
+    return datetime.timedelta(**parts)
+
+
+def enum(choices, maxsize=1024):
+    """Returns a converter mapping slot values to one of `choices`.
+
+    `choices` is a dict of slot value to result, an Enum class, whose members are
+    matched by value or name, or an iterable of allowed slot values.
+    """
+    if isinstance(choices, dict):
+        mapping = dict(choices)
+    elif isinstance(choices, type):
+        mapping = {}
+        for member in choices:
+            mapping[member.name] = member
+            mapping[str(member.value)] = member
+    else:
+        mapping = {choice: choice for choice in choices}
+
+    def convert(value):
+        try:
+            return mapping[value]
+        except KeyError:
+            raise ValueError("{!r} is not one of {}".format(value, list(mapping)))
+
+    return pure(convert, maxsize)
+
+
+BUILTIN_CONVERTERS = {
+    'int': integer,
+    'integer': integer,
+    'korean_number': korean_number,
+    'bool': boolean,
+    'boolean': boolean,
+    'date': date,
+    'duration': duration,
+}
+
+
+def resolve(converter):
+    """Returns the built-in converter named `converter`, or `converter` itself if it is callable."""
+    if callable(converter) or converter is None:
+        return converter
+    try:
+        return BUILTIN_CONVERTERS[converter]
+    except KeyError:
+        raise ValueError('Unknown converter "{}"'.format(converter))
@@ -9,36 +9,124 @@
 
 """
 import os
+import copy
+import time
+import atexit
 import yaml
+import asyncio
 import inspect
+import logging
+import itertools
+import multiprocessing
 from functools import partial
+from concurrent import futures
+from contextlib import contextmanager
+from collections import namedtuple
 
 from werkzeug.local import LocalProxy
 from jinja2 import BaseLoader, ChoiceLoader, TemplateNotFound
-from flask import make_response, current_app, json, request as flask_request, _app_ctx_stack
+from flask import Response, make_response, current_app, g, json, has_app_context, has_request_context, \
+    copy_current_request_context, request as flask_request
 
-from . import verifier, logger
-import collections
+from . import verifier, codec, compression, converters, metrics, workers, logger
+
+
+class ClovaRequestState(object):
+    """The request scoped state of Clova, stored once per request on flask.g.
+
+    The request, session, version, context and convert_errors proxies resolve it in one hop.
+    Since flask.g lives in contextvars, the state follows `async def` handlers into their tasks.
+    To use the proxies from another thread, pass the state along and enter `state.bind()` there.
+    """
+    __slots__ = ('app', 'clova', 'handlers', 'dispatch', 'request', 'session', 'version', 'context',
+                 'convert_errors', 'dbgdump', 'session_data', 'after_response', 'timed_out')
+
+    def __init__(self, clova, app=None):
+        self.app = app
+        self.clova = clova
+        self.handlers = None
+        self.dispatch = None
+        self.request = None
+        self.session = None
+        self.version = None
+        self.context = None
+        self.convert_errors = None
+        self.dbgdump = None
+        self.session_data = None
+        self.after_response = None
+        self.timed_out = False
+
+    @contextmanager
+    def bind(self):
+        """Pushes an app context of the state's app, with this state as the current request state."""
+        with self.app.app_context():
+            g._clova_state = self
+            yield self
+
+
+def request_state():
+    """Returns the ClovaRequestState of the current request."""
+    state = g.get('_clova_state')
+    if state is None:
+        state = g._clova_state = ClovaRequestState(_resolve_clova(), current_app._get_current_object())
+    return state
 
 
 def find_clova():
     """
-    Find our instance of Clova, navigating Local's and possible blueprints.
+    Find the instance of Clova serving the current request.
 
-    Note: This only supports returning a reference to the first instance
-    of Clova found.
+    The instance is resolved once and bound to the request state, so the
+    request, session, version, context and convert_errors proxies do not
+    search for it on every access.
     """
-    if hasattr(current_app, 'clova'):
-        return getattr(current_app, 'clova')
-    else:
-        if hasattr(current_app, 'blueprints'):
-            blueprints = getattr(current_app, 'blueprints')
-            for blueprint_name in blueprints:
-                if hasattr(blueprints[blueprint_name], 'clova'):
-                    return getattr(blueprints[blueprint_name], 'clova')
+    return request_state().clova
+
+
+def _resolve_clova():
+    """
+    Look up the Clova registry of the app, keyed by blueprint name, or None for
+    an instance initialized with init_app.
+    """
+    registry = current_app.extensions.get('clova', {})
+    if has_request_context() and flask_request.blueprint in registry:
+        return registry[flask_request.blueprint]
+    if None in registry:
+        return registry[None]
+    for clova in registry.values():
+        return clova
+
+
+_dbgdump_counter = itertools.count()
+
+
+def _dbgdump_sampled():
+    """Decides once per request whether its payloads are dumped to the debug log."""
+    state = request_state()
+    sampled = state.dbgdump
+    if sampled is None:
+        sample_rate = current_app.config.get('CLOVA_DEBUG_DUMP_SAMPLE_RATE', 1)
+        if current_app.config.get('CLOVA_DEBUG_DUMP_ERRORS_ONLY', False):
+            sampled = False
+        else:
+            sampled = sample_rate <= 1 or next(_dbgdump_counter) % sample_rate == 0
+        state.dbgdump = sampled
+    return sampled
 
 
-def dbgdump(obj, default=None, cls=None):
+def dbgdump(obj, default=None, cls=None, force=False):
+    """Dumps obj, or an encoded json document, as json to the debug log.
+
+    Nothing is serialized unless the flask_clova logger is enabled for DEBUG
+    and the current request was picked by `CLOVA_DEBUG_DUMP_SAMPLE_RATE`.
+    `force` skips the sampling, it is used to dump the payload of failed requests.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if not force and not _dbgdump_sampled():
+        return
+    if isinstance(obj, bytes):
+        obj = json.loads(obj)
     if current_app.config.get('CLOVA_PRETTY_DEBUG_LOGS', False):
         indent = 2
     else:
@@ -46,17 +134,213 @@ def dbgdump(obj, default=None, cls=None):
     msg = json.dumps(obj, indent=indent, default=default, cls=cls)
     logger.debug(msg)
 
+
+def dbgdump_error(obj):
+    """Dumps the payload of a failed request, unless it was already dumped."""
+    if logger.isEnabledFor(logging.DEBUG) and not _dbgdump_sampled():
+        dbgdump(obj, force=True)
+
 #Define global variables
-request = LocalProxy(lambda: find_clova().request)
-session = LocalProxy(lambda: find_clova().session)
-version = LocalProxy(lambda: find_clova().version)
-context = LocalProxy(lambda: find_clova().context)
-convert_errors = LocalProxy(lambda: find_clova().convert_errors)
+request = LocalProxy(lambda: request_state().request)
+session = LocalProxy(lambda: _state_session(request_state()))
+version = LocalProxy(lambda: request_state().version)
+context = LocalProxy(lambda: request_state().context)
+convert_errors = LocalProxy(lambda: request_state().convert_errors)
+
+
+def _state_session(state):
+    if state.session is None:
+        state.session = models._Field()
+    return state.session
+
+from . import models, users
+from .cache import LRUCache
+
+
+class _HandlerRegistry(object):
+    """The view functions of CEK requests, shared by Clova and its tenants."""
+
+    def _init_handlers(self):
+        self._intent_dispatch = {}
+        self._launch_view_func = None
+        self._session_ended_view_func = None
+        self._on_session_started_callback = None
+        self._default_intent_dispatch = None
+        self._event_dispatch = {}
+        self._prefetch_funcs = {}
+
+    def on_session_started(self, f):
+        """Decorator to call wrapped function upon starting a session.
+
+        @clova.on_session_started
+        def new_session():
+            log.info('new session started')
+
+        Because both launch and intent requests may begin a session, this decorator is used call
+        a function regardless of how the session began.
+
+        Arguments:
+            f {function} -- function to be called when session is started.
+        """
+        self._on_session_started_callback = f
+
+        return f
+
+    def launch(self, f):
+        """Decorator maps a view function as the endpoint for an CEK LaunchRequest and starts the skill.
+
+        @clova.launch
+        def launched():
+            return question('Welcome to Foo')
+
+        The wrapped function is registered as the launch view function and renders the response
+        for requests to the Launch URL.
+        A request to the launch URL is verified with the CEK server before the payload is
+        passed to the view function.
+
+        Arguments:
+            f {function} -- Launch view function
+        """
+        self._launch_view_func = f
+
+        return f
+
+    def session_ended(self, f):
+        """Decorator routes CEK SessionEndedRequest to the wrapped view function to end the skill.
+
+        @clova.session_ended
+        def session_ended():
+            return "{}", 200
+
+        The wrapped function is registered as the session_ended view function
+        and renders the response for requests to the end of the session.
+
+        Arguments:
+            f {function} -- session_ended view function
+        """
+        self._session_ended_view_func = f
+
+        return f
+
+    def intent(self, intent_name, mapping=None, convert=None, default=None, cache_response=False,
+               timeout=None, fallback=None):
+        """Decorator routes an CEK IntentRequest and provides the slot parameters to the wrapped function.
+
+        Functions decorated as an intent are registered as the view function for the Intent's URL,
+        and provide the backend responses to give your Skill its functionality.
+
+        @clova.intent('WeatherIntent', mapping={'city': 'City'})
+        def weather(city):
+            return statement('I predict great weather for {}'.format(city))
+
+        Arguments:
+            intent_name {str} -- Name of the intent request to be mapped to the decorated function
 
-from . import models
+        Keyword Arguments:
+            mapping {dict} -- Maps parameters to intent slots of a different name
+                default: {}
 
+            convert {dict} -- Converts slot values to data types before assignment to parameters,
+                with a callable or the name of a converter in flask_clova.converters
+                default: {}
 
-class Clova(object):
+            default {dict} --  Provides default values for Intent slots if CEK reuqest
+                returns no corresponding slot, or a slot with an empty value
+                default: {}
+
+            cache_response {bool} -- The view function always returns the same response.
+                It is only called once, its response is frozen and reused for later requests,
+                with the sessionAttributes of each request spliced in.
+                default: False
+
+            timeout {float} -- Seconds the view function may take. It runs on a thread pool of its own,
+                with a copy of the session, and when it takes longer, `fallback` is returned and the
+                `on_timeout` hooks are called. Changes of a timed out view function to the session,
+                and the `after_response` tasks it queues, are dropped. Overrides `CLOVA_HANDLER_TIMEOUT`.
+                default: None
+
+            fallback {statement or question} -- Response returned when the view function times out.
+                It is frozen, so it is only encoded once.
+                default: `clova.timeout_fallback`, or an empty 504 response
+        """
+        def decorator(f):
+            view_func = _cache_response(f) if cache_response else f
+            self._intent_dispatch[intent_name] = _compile_dispatch(f, mapping, convert, default, view_func,
+                                                                   timeout, _freeze(fallback))
+
+            return f
+        return decorator
+
+    def default_intent(self, f):
+        """Decorator routes any CEK IntentRequest that is not matched by any existing @clova.intent routing."""
+        self._default_intent_dispatch = _compile_dispatch(f)
+
+        return f
+
+
+    def event(self, namespace, name, background=False):
+        """Decorator routes CEK EventRequests of one event to the wrapped view function.
+
+        @clova.event(AudioPlayer.NAMESPACE, AudioPlayer.PROGRESS_REPORT_INTERVAL_PASSED, background=True)
+        def progress():
+            analytics.record(request.event.payload)
+
+        The event is available as `request.event`.
+
+        Arguments:
+            namespace {str} -- namespace of the event, such as 'AudioPlayer'
+            name {str} -- name of the event, such as 'PlayStarted'
+
+        Keyword Arguments:
+            background {bool} -- acknowledge the event at once with an empty response, which keeps
+                the sessionAttributes of the request, and call the view function on a worker thread
+                of `clova.executor`. Its return value is ignored.
+                default: False
+        """
+        def decorator(f):
+            self._event_dispatch[(namespace, name)] = _EventDispatch(f, background)
+
+            return f
+        return decorator
+
+
+    def prefetch(self, f):
+        """Decorator registering a function loading data in the background when a session starts.
+
+        @clova.prefetch
+        def profile():
+            return profiles.fetch(clova._get_user())
+
+        @clova.intent('RecommendIntent')
+        def recommend():
+            return statement(recommendation_for(clova.prefetched('profile')))
+
+        On LaunchRequests and on the first request of a session, the function is called on
+        `clova.executor` with a copy of the request bound, while the view function answers. Its future is
+        kept for the session, keyed by sessionId, for `CLOVA_PREFETCH_TTL` seconds, and
+        `clova.prefetched` waits for its result in later requests. Changes it makes to the session
+        are not saved, tasks it queues with `clova.after_response` run once it returns.
+
+        Arguments:
+            f {function} -- function without arguments, prefetched under its name
+        """
+        self._prefetch_funcs[f.__name__] = f
+
+        return f
+
+
+class ClovaTenant(_HandlerRegistry):
+    """The view functions of one extension served by a shared Clova instance.
+
+    Created with `clova.tenant(application_id)`, it has the decorators of Clova.
+    """
+
+    def __init__(self, application_id):
+        self.application_id = application_id
+        self._init_handlers()
+
+
+class Clova(_HandlerRegistry):
     """The Clova object provides the central interface for interacting with the Clova Extension Service.
 
     Clova object maps CEK Requests to flask view functions and handles CEK sessions.
@@ -64,26 +348,47 @@ class Clova(object):
     The Flask instance allows the convienient API of endpoints and their view functions,
     so that CEK requests may be mapped with syntax similar to a typical Flask server.
     Route provides the entry point for the skill, and must be provided if an app is given.
+    View functions may be defined with `async def`; see flask_clova.asgi to serve them from an ASGI server.
 
     Keyword Arguments:
         app {Flask object} -- App instance - created with Flask(__name__) (default: {None})
         route {str} -- entry point to which initial CEK Requests are forwarded (default: {None})
         blueprint {Flask blueprint} -- Flask Blueprint instance to use instead of Flask App (default: {None})
-        stream_cache {Werkzeug BasicCache} -- BasicCache-like object for storing Audio stream data (default: {SimpleCache})
+        stream_cache {cache.LRUCache} -- cache of the audio streams played with directives.AudioPlayer, keyed by token,
+            anything with get and set (default: {LRUCache(maxsize=1024)})
         path {str} -- path to templates yaml file for VUI dialog (default: {'templates.yaml'})
+        json_backend {str} -- JSON codec used for CEK requests and responses: 'orjson', 'ujson' or 'json'.
+            Overrides `CLOVA_JSON_BACKEND` (default: {None})
+        use_async {bool} -- register an async view, so that Flask 2.x awaits `async def` handlers
+            on its own event loop instead of a private one (default: {False})
+        signature_verifier {verifier.SignatureVerifier} -- verifier for the SignatureCEK header,
+            built from the `CLOVA_PUBLIC_KEY_PATH` and `CLOVA_SIGNATURE_CACHE_SIZE` settings by default (default: {None})
+        session_store {sessions.SessionStore} -- keeps sessionAttributes on the server, keyed by sessionId,
+            instead of sending them back and forth with CEK (default: {None})
+        user_cache {users.UserCache} -- per-user cache exposed as `clova.user_cache` (default: {UserCache()})
     """
 
-    def __init__(self, app=None, route=None, blueprint=None, path='templates.yaml'):
+    def __init__(self, app=None, route=None, blueprint=None, path='templates.yaml', json_backend=None,
+                 use_async=False, signature_verifier=None, session_store=None, user_cache=None, stream_cache=None):
         self.app = app
         self._route = route
-        self._intent_view_funcs = {}
-        self._intent_converts = {}
-        self._intent_defaults = {}
-        self._intent_mappings = {}
-        self._launch_view_func = None
-        self._session_ended_view_func = None
-        self._on_session_started_callback = None
-        self._default_intent_view_func = None
+        self._use_async = use_async
+        self._signature_verifier = signature_verifier
+        self.session_store = session_store
+        self.user_cache = user_cache if user_cache is not None else users.UserCache()
+        self.stream_cache = stream_cache if stream_cache is not None else LRUCache(maxsize=1024)
+        self._application_ids = None
+        self._application_ids_source = None
+        self._json_backend = json_backend
+        self._json_codec = None
+        self._tenants = {}
+        self._timing_callbacks = []
+        self._timeout_callbacks = []
+        self.timeout_fallback = None
+        self._prefetched = LRUCache(maxsize=10000)
+        self._executor = None
+        self._handler_executor = None
+        self._init_handlers()
 
         if app is not None:
             self.init_app(app, path)
@@ -101,6 +406,8 @@ class Clova(object):
             list of allowed application IDs. By default, application ID verification is disabled and a
             warning is logged. This variable should be set in production to ensure
             requests are being sent by the applications you specify.
+            The allowed IDs are normalized into a set once; call `refresh_application_ids`
+            after changing the list in place.
             Default: None
 
         `CLOVA_VERIFY_REQUESTS`:
@@ -110,18 +417,106 @@ class Clova(object):
             It is useful for mocking JSON requests in automated tests.
             Default: True
 
+        `CLOVA_VERIFY_SIGNATURE`:
+
+            Verifies the SignatureCEK header of each request against the public key of CEK,
+            when `CLOVA_VERIFY_REQUESTS` is enabled. Requires the cryptography package.
+            Default: False
+
+        `CLOVA_PUBLIC_KEY_PATH`:
+
+            Path to the PEM public key of CEK. By default the key is downloaded once, on the first request.
+            Default: None
+
+        `CLOVA_SIGNATURE_CACHE_SIZE`:
+
+            Number of verified request bodies remembered, so retried requests skip the RSA operation.
+            Default: 1024
+
         `CLOVA_PRETTY_DEBUG_LOGS`:
 
             Add tabs and linebreaks to the CEK request and response printed to the debug log.
             This improves readability when printing to the console, but breaks formatting when logging to CloudWatch.
             Default: False
+
+        `CLOVA_JSON_BACKEND`:
+
+            JSON codec used to decode CEK requests and encode responses: 'orjson', 'ujson', 'json',
+            or 'auto' for the fastest installed one. 'json' is flask.json, which honours the app's
+            JSON provider. If the backend is not installed, the fastest available one is used instead.
+            Default: 'json'
+
+        `CLOVA_DEBUG_DUMP_SAMPLE_RATE`:
+
+            Dump only 1 in N CEK requests and responses to the debug log. Nothing is dumped
+            unless the flask_clova logger is enabled for DEBUG.
+            Default: 1
+
+        `CLOVA_DEBUG_DUMP_ERRORS_ONLY`:
+
+            Dump the CEK request to the debug log only when its handler fails or is not defined.
+            Default: False
+
+        `CLOVA_COMPRESSION`:
+
+            Compress response bodies with 'gzip' or 'br', or a list of both in order of preference,
+            when the request accepts it. True prefers brotli, when it is installed, over gzip.
+            Default: False
+
+        `CLOVA_COMPRESSION_MIN_SIZE`:
+
+            Only compress response bodies of at least that many bytes.
+            Default: 1024
+
+        `CLOVA_HANDLER_TIMEOUT`:
+
+            Seconds any view function may take, unless its intent sets a timeout of its own.
+            View functions with a timeout run on a thread pool of their own, and are answered
+            with their fallback response when they take longer.
+            Default: None
+
+        `CLOVA_HANDLER_THREADS`:
+
+            Number of threads running view functions with a timeout. Time spent waiting for
+            a free thread counts against the timeout.
+            Default: 16
+
+        `CLOVA_PREFETCH_TTL`:
+
+            Seconds the results of the `prefetch` functions are kept for a session.
+            Default: 600
+
+        `CLOVA_WORKER_THREADS`:
+
+            Number of worker threads of `clova.executor`, which runs background event handlers,
+            `after_response` tasks and `prefetch` functions.
+            Default: 4
+
+        `CLOVA_WORKER_QUEUE_SIZE`:
+
+            Maximum number of queued background tasks. Beyond it, tasks run in the request thread.
+            Default: 1000
+
+        `CLOVA_SERVER_TIMING`:
+
+            Add a Server-Timing header with the time spent in each stage of the request.
+            Default: False
+
+        `CLOVA_TEMPLATE_RELOAD`:
+
+            Check the templates yaml file for changes on every lookup (True), at most once every
+            N seconds (a number), or never (False). Templates are only reloaded by Jinja
+            when `TEMPLATES_AUTO_RELOAD` is enabled, which is the default in debug mode.
+            Default: None, which checks on every lookup in debug mode only
         """
         if self._route is None:
             raise TypeError("route is a required argument when app is not None")
 
         app.clova = self
+        app.extensions.setdefault('clova', {})[None] = self
+        self._set_application_ids(app.config.get('CLOVA_APPLICATION_ID'))
 
-        app.add_url_rule(self._route, view_func=self._flask_view_func, methods=['POST'])
+        app.add_url_rule(self._route, view_func=self._view_func, methods=['POST'])
         app.jinja_loader = ChoiceLoader([app.jinja_loader, YamlLoader(app, path)])
 
     def init_blueprint(self, blueprint, path='templates.yaml'):
@@ -137,175 +532,288 @@ class Clova(object):
 
         # we need to tuck our reference to this Clova instance into the blueprint object and find it later!
         blueprint.clova = self
+        blueprint.record(self._register_blueprint)
 
         # BlueprintSetupState.add_url_rule gets called underneath the covers and
         # concats the rule string, so we should set to an empty string to allow
         # Blueprint('blueprint_api', __name__, url_prefix="/clova") to result in
         # exposing the rule at "/clova" and not "/clova/".
-        blueprint.add_url_rule("", view_func=self._flask_view_func, methods=['POST'])
+        blueprint.add_url_rule("", view_func=self._view_func, methods=['POST'])
         blueprint.jinja_loader = ChoiceLoader([YamlLoader(blueprint, path)])
 
+    @property
+    def _view_func(self):
+        return self._flask_view_func_async if self._use_async else self._flask_view_func
+
+    def _register_blueprint(self, state):
+        name = getattr(state, 'name', state.blueprint.name)
+        state.app.extensions.setdefault('clova', {})[name] = self
+
     @property
     def clova_application_id(self):
         return current_app.config.get('CLOVA_APPLICATION_ID', None)
 
+    @property
+    def application_ids(self):
+        """The frozenset of allowed application IDs, or None when verification is disabled.
+
+        It is rebuilt whenever `CLOVA_APPLICATION_ID` is assigned a new value.
+        """
+        records = current_app.config.get('CLOVA_APPLICATION_ID')
+        if records is not self._application_ids_source:
+            self._set_application_ids(records)
+        return self._application_ids
+
+    def refresh_application_ids(self):
+        """Rebuilds the allowed application IDs from the app config."""
+        self._set_application_ids(current_app.config.get('CLOVA_APPLICATION_ID'))
+
+    def _set_application_ids(self, records):
+        self._application_ids_source = records
+        self._application_ids = verifier.normalize_application_ids(records)
+
     @property
     def clova_verify_requests(self):
         return current_app.config.get('CLOVA_VERIFY_REQUESTS', True)
 
-    def on_session_started(self, f):
-        """Decorator to call wrapped function upon starting a session.
+    @property
+    def clova_verify_signature(self):
+        return current_app.config.get('CLOVA_VERIFY_SIGNATURE', False)
 
-        @clova.on_session_started
-        def new_session():
-            log.info('new session started')
+    @property
+    def signature_verifier(self):
+        if self._signature_verifier is None:
+            self._signature_verifier = verifier.SignatureVerifier(
+                key_path=current_app.config.get('CLOVA_PUBLIC_KEY_PATH'),
+                cache_size=current_app.config.get('CLOVA_SIGNATURE_CACHE_SIZE', 1024)
+            )
+        return self._signature_verifier
 
-        Because both launch and intent requests may begin a session, this decorator is used call
-        a function regardless of how the session began.
+    @property
+    def json_codec(self):
+        if self._json_codec is None:
+            backend = self._json_backend or current_app.config.get('CLOVA_JSON_BACKEND', 'json')
+            self._json_codec = codec.get_codec(backend)
+        return self._json_codec
 
-        Arguments:
-            f {function} -- function to be called when session is started.
-        """
-        self._on_session_started_callback = f
+    @property
+    def executor(self):
+        """The workers.BoundedExecutor running background event handlers and `after_response` tasks.
 
-        return f
+        Built on first use from the `CLOVA_WORKER_THREADS` and `CLOVA_WORKER_QUEUE_SIZE` settings.
+        """
+        if self._executor is None:
+            self._executor = workers.BoundedExecutor(
+                current_app.config.get('CLOVA_WORKER_THREADS', 4),
+                current_app.config.get('CLOVA_WORKER_QUEUE_SIZE', 1000)
+            )
+            atexit.register(self.shutdown)
+        return self._executor
 
-    def launch(self, f):
-        """Decorator maps a view function as the endpoint for an CEK LaunchRequest and starts the skill.
+    @property
+    def handler_executor(self):
+        """The thread pool running view functions with a timeout, sized by `CLOVA_HANDLER_THREADS`.
 
-        @clova.launch
-        def launched():
-            return question('Welcome to Foo')
+        It is separate from `clova.executor`, so background work does not delay them.
+        """
+        if self._handler_executor is None:
+            self._handler_executor = futures.ThreadPoolExecutor(
+                current_app.config.get('CLOVA_HANDLER_THREADS', 16), thread_name_prefix='clova-handler'
+            )
+            atexit.register(self.shutdown)
+        return self._handler_executor
+
+    def after_response(self, func, *args, **kwargs):
+        """Calls func(*args, **kwargs) on `clova.executor` once the response of the current request is built.
+
+        @clova.intent('OrderIntent')
+        def order(menu):
+            clova.after_response(analytics.record, 'order', menu)
+            return statement('{} 주문했습니다.'.format(menu))
+
+        The task runs with the request bound, so the request, session and context proxies
+        still describe the request that queued it. Tasks of a failed request are dropped.
+        """
+        state = request_state()
+        if state.after_response is None:
+            state.after_response = []
+        state.after_response.append((func, args, kwargs))
 
-        The wrapped function is registered as the launch view function and renders the response
-        for requests to the Launch URL.
-        A request to the launch URL is verified with the CEK server before the payload is
-        passed to the view function.
+    def prefetched(self, name, timeout=None):
+        """Returns the result of the prefetch function `name` for the current session.
 
-        Arguments:
-            f {function} -- Launch view function
+        Waits at most `timeout` seconds for it, or raises concurrent.futures.TimeoutError.
+        The function is called now when nothing was prefetched for the session.
+        Exceptions of the function are raised.
         """
-        self._launch_view_func = f
+        future = self._prefetch_future(name)
+        if future is None:
+            return _run_sync(request_state().handlers._prefetch_funcs[name]())
+        return future.result(timeout)
+
+    async def prefetched_async(self, name, timeout=None):
+        """Same as prefetched, to be awaited in `async def` view functions."""
+        future = self._prefetch_future(name)
+        if future is None:
+            result = request_state().handlers._prefetch_funcs[name]()
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    def _prefetch_future(self, name):
+        session_id = self.session.sessionId
+        prefetched = self._prefetched.get(session_id) if session_id else None
+        if prefetched is None:
+            return None
+        return prefetched.get(name)
+
+    def shutdown(self, wait=True):
+        """Stops `clova.executor` and `clova.handler_executor`, and waits for their queued tasks
+        to finish if `wait` is set.
+
+        It is called at interpreter exit to drain the queues.
+        """
+        executors = self._executor, self._handler_executor
+        self._executor = self._handler_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=wait)
 
-        return f
+    def tenant(self, application_id):
+        """Returns the handlers of the extension with this applicationId, created on first use.
 
-    def session_ended(self, f):
-        """Decorator routes CEK SessionEndedRequest to the wrapped view function to end the skill.
+        shopping = clova.tenant('com.example.extension.shopping')
 
-        @clova.session_ended
-        def session_ended():
-            return "{}", 200
+        @shopping.intent('OrderIntent')
+        def order(menu):
+            return statement('{} 주문했습니다.'.format(menu))
 
-        The wrapped function is registered as the session_ended view function
-        and renders the response for requests to the end of the session.
+        Requests are routed with a dict lookup on `context.System.application.applicationId`.
+        Requests of other extensions are handled by the view functions registered on the
+        Clova instance itself. The applicationIds of tenants pass application ID verification.
 
         Arguments:
-            f {function} -- session_ended view function
+            application_id {str} -- applicationId of the extension
         """
-        self._session_ended_view_func = f
-
-        return f
+        tenant = self._tenants.get(application_id)
+        if tenant is None:
+            tenant = self._tenants[application_id] = ClovaTenant(application_id)
+        return tenant
 
-    def intent(self, intent_name, mapping=None, convert=None, default=None):
-        """Decorator routes an CEK IntentRequest and provides the slot parameters to the wrapped function.
+    def on_timeout(self, f):
+        """Decorator registering a callback for view functions exceeding their timeout.
 
-        Functions decorated as an intent are registered as the view function for the Intent's URL,
-        and provide the backend responses to give your Skill its functionality.
+        @clova.on_timeout
+        def timed_out(request_type, intent_name, timeout):
+            statsd.increment('clova.timeout.' + (intent_name or request_type))
 
-        @clova.intent('WeatherIntent', mapping={'city': 'City'})
-        def weather(city):
-            return statement('I predict great weather for {}'.format(city))
+        Timeouts are set per intent with `@clova.intent(..., timeout=...)`, or for all view
+        functions with `CLOVA_HANDLER_TIMEOUT`. Requests of view functions without a fallback
+        response of their own are answered with `clova.timeout_fallback`, when it is set.
 
         Arguments:
-            intent_name {str} -- Name of the intent request to be mapped to the decorated function
-
-        Keyword Arguments:
-            mapping {dict} -- Maps parameters to intent slots of a different name
-                default: {}
+            f {function} -- called with (request_type, intent_name, timeout)
+        """
+        self._timeout_callbacks.append(f)
 
-            convert {dict} -- Converts slot values to data types before assignment to parameters
-                default: {}
+        return f
 
-            default {dict} --  Provides default values for Intent slots if CEK reuqest
-                returns no corresponding slot, or a slot with an empty value
-                default: {}
-        """
-        if mapping is None:
-            mapping = dict()
-        if convert is None:
-            convert = dict()
-        if default is None:
-            default = dict()
+    def on_timing(self, f):
+        """Decorator registering a callback for the time spent in each stage of a request.
 
-        def decorator(f):
-            self._intent_view_funcs[intent_name] = f
-            self._intent_mappings[intent_name] = mapping
-            self._intent_converts[intent_name] = convert
-            self._intent_defaults[intent_name] = default
+        @clova.on_timing
+        def timing(stage, duration_ns, request_type, intent_name):
+            statsd.timing('clova.' + stage, duration_ns / 1e6)
 
-            return f
-        return decorator
+        The stages are verify, parse, wrap, session_started, dispatch, handler and render.
+        intent_name is None for requests other than IntentRequest. Requests are not timed
+        at all while no callback is registered and `CLOVA_SERVER_TIMING` is disabled.
+        See flask_clova.metrics.TimingHistogram for a Prometheus-style histogram callback.
 
-    def default_intent(self, f):
-        """Decorator routes any CEK IntentRequest that is not matched by any existing @clova.intent routing."""
-        self._default_intent_view_func = f
+        Arguments:
+            f {function} -- called with (stage, duration_ns, request_type, intent_name)
+        """
+        self._timing_callbacks.append(f)
 
         return f
 
     @property
     def request(self):
-        return getattr(_app_ctx_stack.top, '_clova_request', None)
+        return request_state().request
 
     @request.setter
     def request(self, value):
-        _app_ctx_stack.top._clova_request = value
+        request_state().request = value
 
     @property
     def session(self):
-        return getattr(_app_ctx_stack.top, '_clova_session', models._Field())
+        return _state_session(request_state())
 
     @session.setter
     def session(self, value):
-        _app_ctx_stack.top._clova_session = value
+        request_state().session = value
 
     @property
     def version(self):
-        return getattr(_app_ctx_stack.top, '_clova_version', None)
+        return request_state().version
 
     @version.setter
     def version(self, value):
-        _app_ctx_stack.top._clova_version = value
+        request_state().version = value
 
     @property
     def context(self):
-        return getattr(_app_ctx_stack.top, '_clova_context', None)
+        return request_state().context
 
     @context.setter
     def context(self, value):
-        _app_ctx_stack.top._clova_context = value
+        request_state().context = value
 
     @property
     def convert_errors(self):
-        return getattr(_app_ctx_stack.top, '_clova_convert_errors', None)
+        return request_state().convert_errors
 
     @convert_errors.setter
     def convert_errors(self, value):
-        _app_ctx_stack.top._clova_convert_errors = value
+        request_state().convert_errors = value
 
     def _get_user(self):
         if self.context:
             return self.context.get('System', {}).get('user', {}).get('userId')
         return None
 
-    def _cek_request(self, verify=True):
+    def _get_access_token(self):
+        if self.context:
+            return self.context.get('System', {}).get('user', {}).get('accessToken')
+        return None
+
+    def _cek_request(self, verify=True, timer=None):
         raw_body = flask_request.data
-        cek_request_payload = json.loads(raw_body)
 
+        # verify request signature before spending time on the body
         if verify:
-            # verify application id
-            if self.clova_application_id is not None:
-                application_id = cek_request_payload['context']['System']['application']['applicationId']
-                verifier.verify_application_id(application_id, self.clova_application_id)
+            self._verify_signature(raw_body)
+            if timer is not None:
+                timer.mark('verify')
+
+        cek_request_payload = self._decode_request(raw_body)
+        if timer is not None:
+            timer.mark('parse')
+
+        if verify:
+            self._verify_application_id(cek_request_payload)
+            if timer is not None:
+                timer.mark('verify')
+
+        return cek_request_payload
+
+    def _verify_signature(self, raw_body):
+        if self.clova_verify_signature:
+            self.signature_verifier.verify(raw_body, flask_request.headers.get('SignatureCEK'))
+
+    def _decode_request(self, raw_body):
+        cek_request_payload = self.json_codec.loads(raw_body)
 
         try:
             cek_request_payload['session']
@@ -316,98 +824,491 @@ class Clova(object):
 
         return cek_request_payload
 
+    def _verify_application_id(self, cek_request_payload):
+        application_ids = self.application_ids
+        if application_ids is not None:
+            application_id = cek_request_payload['context']['System']['application']['applicationId']
+            if application_id not in self._tenants:
+                verifier.verify_application_id(application_id, application_ids)
+
     def _flask_view_func(self, *args, **kwargs):
-        clova_payload = self._cek_request(verify=self.clova_verify_requests)
+        g._clova_state = ClovaRequestState(self, current_app._get_current_object())
+        timer = self._stage_timer()
+        clova_payload = self._cek_request(verify=self.clova_verify_requests, timer=timer)
         dbgdump(clova_payload)
-        request_body = models._Field(clova_payload)
 
-        self.request = request_body.request
-        self.version = request_body.version
-        self.context = getattr(request_body, 'context', models._Field())
-        self.session = getattr(request_body, 'session', models._Field())
+        try:
+            result = self._dispatch_request(clova_payload, timer)
+        except Exception:
+            dbgdump_error(clova_payload)
+            raise
+
+        response = self._make_response(result, clova_payload, timer)
+        if timer is not None:
+            self._report_timing(timer, response)
+        if g._clova_state.after_response:
+            self._submit_after_response(g._clova_state)
+        return response
+
+    async def _flask_view_func_async(self, *args, **kwargs):
+        g._clova_state = ClovaRequestState(self, current_app._get_current_object())
+        timer = self._stage_timer()
+        clova_payload = self._cek_request(verify=self.clova_verify_requests, timer=timer)
+        dbgdump(clova_payload)
+
+        try:
+            result = await self._dispatch_request_async(clova_payload, timer)
+        except Exception:
+            dbgdump_error(clova_payload)
+            raise
+
+        response = self._make_response(result, clova_payload, timer)
+        if timer is not None:
+            self._report_timing(timer, response)
+        if g._clova_state.after_response:
+            self._submit_after_response(g._clova_state)
+        return response
 
-        if not self.session.sessionAttributes:
-            self.session.sessionAttributes = models._Field()
+    def dispatch_many(self, payloads, app=None, processes=None, chunksize=64):
+        """Dispatches CEK requests without WSGI, e.g. to replay request logs, and yields their responses.
 
+        for status, body in clova.dispatch_many(open('requests.log', 'rb')):
+            responses.write(body)
+
+        All requests share one request context. Neither the signature nor the application ID
+        of the requests are verified. (status code, body) pairs are yielded in the order of
+        `payloads`, with bytes bodies, and (400, b'') for a request without handler, as the
+        view would answer. Exceptions of the handlers are raised.
+
+        Arguments:
+            payloads {iterable} -- encoded CEK requests, as bytes or str, or decoded dicts
+
+        Keyword Arguments:
+            app {Flask object} -- app whose config and templates are used (default: {the app of this Clova, or current_app})
+            processes {int} -- spread the requests over that many forked worker processes,
+                each with its own request context. Payloads and bodies are pickled between
+                processes, handlers must not rely on state shared with the parent (default: {None})
+            chunksize {int} -- number of requests sent to a worker process at once (default: {64})
+        """
+        if app is None:
+            app = self.app if self.app is not None else current_app._get_current_object()
+
+        if processes is None:
+            with app.test_request_context(self._route or '/', method='POST'):
+                for payload in payloads:
+                    yield self._dispatch_payload(payload, app)
+            return
+
+        pool = multiprocessing.get_context('fork').Pool(processes, _init_dispatch_worker, (self, app))
         try:
-            if self.session.new and self._on_session_started_callback is not None:
-                self._on_session_started_callback()
-        except AttributeError:
-            pass
+            for response in pool.imap(_dispatch_worker, payloads, chunksize):
+                yield response
+        finally:
+            pool.terminate()
+
+    def _dispatch_payload(self, payload, app):
+        g._clova_state = ClovaRequestState(self, app)
+        if isinstance(payload, dict):
+            payload = dict(payload)
+            payload.setdefault('session', {})
+        else:
+            payload = self._decode_request(payload)
 
-        result = None
-        request_type = self.request.type
+        try:
+            result = self._dispatch_request(payload)
+        except Exception:
+            dbgdump_error(payload)
+            raise
 
-        if request_type == 'LaunchRequest' and self._launch_view_func:
-            result = self._launch_view_func()
-        elif request_type == 'SessionEndedRequest':
-            if self._session_ended_view_func:
-                result = self._session_ended_view_func()
+        if result is None:
+            response = 400, b''
+        else:
+            if self.session_store is not None and not g._clova_state.timed_out:
+                self._save_session()
+            if isinstance(result, models._Response):
+                result = result.render_response()
+            if isinstance(result, bytes):
+                response = 200, result
             else:
-                logger.info("SessionEndedRequest Handler is not defined.")
-                result = "{}", 200
-        elif request_type == 'IntentRequest' and (self._intent_view_funcs or self._default_intent_view_func):
-            result = self._map_intent_to_view_func(self.request.intent)()
+                result = make_response(result)
+                response = result.status_code, result.get_data()
+        if g._clova_state.after_response:
+            self._submit_after_response(g._clova_state)
+        return response
 
+    def _make_response(self, result, clova_payload, timer=None):
         if result is not None:
+            if self.session_store is not None and not g._clova_state.timed_out:
+                self._save_session()
             if isinstance(result, models._Response):
                 result = result.render_response()
-            response = make_response(result)
-            response.mimetype = 'application/json;charset=utf-8'
+            if isinstance(result, bytes):
+                response = self._json_response(result)
+            else:
+                response = make_response(result)
+                response.mimetype = 'application/json;charset=utf-8'
+            if timer is not None:
+                timer.mark('render')
             return response
-        logger.warning(request_type + " handler is not defined.")
+        dbgdump_error(clova_payload)
+        logger.warning(self.request.type + " handler is not defined.")
         return "", 400
 
-    def _map_intent_to_view_func(self, intent):
-        """Provides appropiate parameters to the intent functions."""
-        if intent.name in self._intent_view_funcs:
-            view_func = self._intent_view_funcs[intent.name]
-        elif self._default_intent_view_func is not None:
-            view_func = self._default_intent_view_func
+    def _json_response(self, body):
+        """Builds the response of an encoded body at once, compressed when `CLOVA_COMPRESSION` allows."""
+        config = current_app.config
+        headers = None
+        preferred = compression.encodings(config.get('CLOVA_COMPRESSION', False))
+        if preferred:
+            headers = {'Vary': 'Accept-Encoding'}
+            if len(body) >= config.get('CLOVA_COMPRESSION_MIN_SIZE', 1024):
+                encoding, body = compression.compress(body, preferred, flask_request.accept_encodings)
+                if encoding is not None:
+                    headers['Content-Encoding'] = encoding
+        return current_app.response_class(body, headers=headers, content_type='application/json;charset=utf-8')
+
+    def _dispatch_request(self, clova_payload, timer=None):
+        """Binds the CEK request to the app context and calls the matching view function.
+
+        Coroutines returned by `async def` handlers are run to completion on a private event loop.
+        """
+        if self._submit_background_event(clova_payload):
+            return self._event_ack(clova_payload)
+
+        self._bind_request(clova_payload)
+        if timer is not None:
+            timer.mark('wrap')
+
+        try:
+            on_session_started = request_state().handlers._on_session_started_callback
+            if self.session.new and on_session_started is not None:
+                _run_sync(on_session_started())
+                if timer is not None:
+                    timer.mark('session_started')
+        except AttributeError:
+            pass
+
+        self._start_prefetch()
+        view_func = self._select_view_func()
+        if timer is not None:
+            timer.mark('dispatch')
+        if view_func is None:
+            return None
+        timeout = self._handler_timeout()
+        if timeout:
+            result = self._run_with_timeout(view_func, timeout)
         else:
-            raise NotImplementedError('Intent "{}" not found and no default intent specified.'.format(intent.name))
+            result = _run_sync(view_func())
+        if timer is not None:
+            timer.mark('handler')
+        return result
+
+    async def _dispatch_request_async(self, clova_payload, timer=None):
+        """Same as _dispatch_request, but awaits `async def` handlers on the running event loop."""
+        if self._submit_background_event(clova_payload):
+            return self._event_ack(clova_payload)
+
+        self._bind_request(clova_payload)
+        if timer is not None:
+            timer.mark('wrap')
 
-        argspec = inspect.getfullargspec(view_func)
-        arg_names = argspec.args
-        arg_values = self._map_params_to_view_args(intent.name, arg_names)
+        try:
+            on_session_started = request_state().handlers._on_session_started_callback
+            if self.session.new and on_session_started is not None:
+                started = on_session_started()
+                if inspect.isawaitable(started):
+                    await started
+                if timer is not None:
+                    timer.mark('session_started')
+        except AttributeError:
+            pass
 
-        return partial(view_func, *arg_values)
+        self._start_prefetch()
+        view_func = self._select_view_func()
+        if timer is not None:
+            timer.mark('dispatch')
+        if view_func is None:
+            return None
+        timeout = self._handler_timeout()
+        if timeout:
+            state = request_state()
+            future, worker_state = self._submit_handler(state, view_func)
+            try:
+                result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except asyncio.TimeoutError:
+                future.add_done_callback(_log_late_failure)
+                result = self._timed_out(timeout)
+            else:
+                _adopt_state(state, worker_state)
+        else:
+            result = view_func()
+            if inspect.isawaitable(result):
+                result = await result
+        if timer is not None:
+            timer.mark('handler')
+        return result
+
+    def _start_prefetch(self):
+        """Submits the prefetch functions when a session starts, and forgets their futures when it ends."""
+        state = request_state()
+        prefetch_funcs = state.handlers._prefetch_funcs
+        if not prefetch_funcs:
+            return
+        session_id = self.session.sessionId
+        if not session_id:
+            return
 
-    def _map_params_to_view_args(self, view_name, arg_names):
+        request_type = self.request.type
+        if request_type == 'SessionEndedRequest':
+            self._prefetched.delete(session_id)
+        elif request_type == 'LaunchRequest' or self.session.new:
+            self._prefetched.set(session_id, {
+                name: self.executor.submit(self._run_prefetch, _copy_state(state), func)
+                for name, func in prefetch_funcs.items()
+            }, ttl=current_app.config.get('CLOVA_PREFETCH_TTL', 600))
+
+    def _run_prefetch(self, state, func):
+        """Runs a prefetch function on its own copy of the request state, then submits the tasks it queued."""
+        with state.bind():
+            result = _run_sync(func())
+            if state.after_response:
+                self._submit_after_response(state)
+            return result
+
+    def _handler_timeout(self):
+        dispatch = request_state().dispatch
+        if dispatch is not None and dispatch.timeout is not None:
+            return dispatch.timeout
+        return current_app.config.get('CLOVA_HANDLER_TIMEOUT')
+
+    def _run_with_timeout(self, view_func, timeout):
+        """Runs the view function on the handler executor, and returns the fallback response if it takes too long.
+
+        The view function works on a copy of the request state, which is only adopted when it returns in time.
         """
-        find and invoke appropriate function
+        state = request_state()
+        future, worker_state = self._submit_handler(state, view_func)
+        try:
+            result = future.result(timeout)
+        except futures.TimeoutError:
+            if not future.cancel():
+                future.add_done_callback(_log_late_failure)
+            return self._timed_out(timeout)
+        _adopt_state(state, worker_state)
+        return result
+
+    def _submit_handler(self, state, view_func):
+        """Submits the view function to the handler executor, with a copy of the request state
+        and of the request context, so it can still read flask.request.
+
+        Returns the future of the view function and the copied state.
+        """
+        worker_state = _copy_state(state)
+        run = partial(self._run_bound, worker_state, view_func)
+        if has_request_context():
+            run = copy_current_request_context(run)
+        return self.handler_executor.submit(run), worker_state
+
+    @staticmethod
+    def _run_bound(state, view_func):
+        with state.bind():
+            return _run_sync(view_func())
+
+    def _timed_out(self, timeout):
+        request_state().timed_out = True
+        request = self.request
+        intent_name = request.intent.name if request.type == 'IntentRequest' and request.intent else None
+        logger.warning("%s handler timed out after %ss.", intent_name or request.type, timeout)
+        for callback in self._timeout_callbacks:
+            callback(request.type, intent_name, timeout)
+
+        dispatch = request_state().dispatch
+        fallback = dispatch.fallback if dispatch is not None and dispatch.fallback is not None else self.timeout_fallback
+        if fallback is None:
+            return "", 504
+        return fallback
+
+    def _submit_background_event(self, clova_payload):
+        """Submits the view function of a background event to the executor, without binding the request.
+
+        Returns False when the event has no background view function.
         """
+        try:
+            request_body = clova_payload['request']
+            if request_body['type'] != 'EventRequest':
+                return False
+            event = request_body['event']
+            dispatch = self._handlers_for(clova_payload)._event_dispatch.get((event['namespace'], event['name']))
+        except (KeyError, TypeError):
+            return False
+        if dispatch is None or not dispatch.background:
+            return False
+
+        self.executor.submit(self._run_background, dispatch.view_func, clova_payload,
+                             current_app._get_current_object())
+        return True
+
+    def _submit_after_response(self, state):
+        for func, args, kwargs in state.after_response:
+            self.executor.submit(self._run_after_response, state, func, args, kwargs)
+        state.after_response = None
+
+    @staticmethod
+    def _run_after_response(state, func, args, kwargs):
+        with state.bind():
+            func(*args, **kwargs)
+
+    def _event_ack(self, clova_payload):
+        """The empty response acknowledging a background event, which keeps the session's attributes."""
+        attributes = (clova_payload.get('session') or {}).get('sessionAttributes')
+        if not attributes:
+            return _EVENT_ACK
+        return b''.join((_EVENT_ACK_PREFIX, self.json_codec.dumps(attributes), _EVENT_ACK_SUFFIX))
+
+    def _run_background(self, view_func, clova_payload, app):
+        with ClovaRequestState(self, app).bind() as state:
+            self._bind_request(clova_payload)
+            _run_sync(view_func())
+            if state.after_response:
+                self._submit_after_response(state)
+
+    def _stage_timer(self):
+        """Returns a StageTimer when timing callbacks or Server-Timing headers are enabled, else None."""
+        if self._timing_callbacks or current_app.config.get('CLOVA_SERVER_TIMING', False):
+            return metrics.StageTimer()
+        return None
 
-        arg_values = []
-        convert = self._intent_converts.get(view_name)
-        default = self._intent_defaults.get(view_name)
-        mapping = self._intent_mappings.get(view_name)
+    def _report_timing(self, timer, response):
+        request = self.request
+        request_type = request.type if request else None
+        intent_name = None
+        if request_type == 'IntentRequest' and request.intent:
+            intent_name = request.intent.name
+
+        for callback in self._timing_callbacks:
+            for stage, duration_ns in timer.stages.items():
+                callback(stage, duration_ns, request_type, intent_name)
+
+        if current_app.config.get('CLOVA_SERVER_TIMING', False) and isinstance(response, Response):
+            response.headers['Server-Timing'] = ', '.join(
+                '{};dur={:.3f}'.format(stage, duration_ns / 1e6) for stage, duration_ns in timer.stages.items()
+            )
+
+    def _bind_request(self, clova_payload):
+        request_body = models._Field(clova_payload)
+
+        state = request_state()
+        state.handlers = self._handlers_for(clova_payload)
+        state.request = request_body.request
+        state.version = request_body.version
+        state.context = getattr(request_body, 'context', models._Field())
+        state.session = getattr(request_body, 'session', models._Field())
+
+        if not state.session.sessionAttributes:
+            state.session.sessionAttributes = models._Field()
+
+        if self.session_store is not None:
+            self._load_session()
+
+    def _handlers_for(self, clova_payload):
+        """Returns the tenant registered for the applicationId of the request, or this instance."""
+        if not self._tenants:
+            return self
+        try:
+            application_id = clova_payload['context']['System']['application']['applicationId']
+        except (KeyError, TypeError):
+            return self
+        return self._tenants.get(application_id, self)
+
+    def _load_session(self):
+        """Replaces the sessionAttributes of the request with the ones kept in the session store."""
+        session_id = self.session.sessionId
+        if not session_id:
+            return
+        data = self.session_store.load(session_id)
+        request_state().session_data = data
+        self.session.sessionAttributes = models._Field(self.json_codec.loads(data) if data else {})
+
+    def _save_session(self):
+        """Saves the sessionAttributes to the session store, unless the handler left them unchanged.
+
+        Sessions that had nothing stored and still have no attributes are neither encoded nor saved.
+        """
+        session_id = self.session.sessionId
+        if not session_id:
+            return
+        if self.request.type == 'SessionEndedRequest':
+            self.session_store.delete(session_id)
+            return
+        session_data = request_state().session_data
+        attributes = self.session.sessionAttributes
+        if session_data is None and not attributes:
+            return
+        data = self.json_codec.dumps(attributes)
+        if data != session_data:
+            self.session_store.save(session_id, data)
+
+    def _response_session_attributes(self):
+        """The sessionAttributes sent back to CEK, only a reference when a session store is used."""
+        if self.session_store is not None and self.session.sessionId:
+            return {'sessionRef': self.session.sessionId}
+        sessionAttributes = self.session.sessionAttributes
+        if sessionAttributes is None:
+            sessionAttributes = {}
+        return sessionAttributes
+
+    def _select_view_func(self):
+        """Returns the view function for the bound request, with its arguments applied."""
+        handlers = request_state().handlers or self
+        request_type = self.request.type
+
+        if request_type == 'LaunchRequest' and handlers._launch_view_func:
+            return handlers._launch_view_func
+        elif request_type == 'SessionEndedRequest':
+            if handlers._session_ended_view_func:
+                return handlers._session_ended_view_func
+            logger.info("SessionEndedRequest Handler is not defined.")
+            return _session_ended_default
+        elif request_type == 'IntentRequest' and (handlers._intent_dispatch or handlers._default_intent_dispatch):
+            return self._map_intent_to_view_func(self.request.intent, handlers)
+        elif request_type == 'EventRequest' and self.request.event:
+            event = self.request.event
+            dispatch = handlers._event_dispatch.get((event.namespace, event.name))
+            if dispatch is not None:
+                return dispatch.view_func
+        return None
+
+    def _map_intent_to_view_func(self, intent, handlers=None):
+        """Provides appropiate parameters to the intent functions."""
+        handlers = handlers or self
+        dispatch = handlers._intent_dispatch.get(intent.name, handlers._default_intent_dispatch)
+        if dispatch is None:
+            raise NotImplementedError('Intent "{}" not found and no default intent specified.'.format(intent.name))
+        request_state().dispatch = dispatch
+
+        arg_values = self._map_params_to_view_args(dispatch, intent)
+
+        return partial(dispatch.view_func, *arg_values)
 
+    def _map_params_to_view_args(self, dispatch, intent):
+        """
+        bind slot values of the intent to the arguments of a compiled dispatch record
+        """
+        arg_values = []
         convert_errors = {}
 
         request_data = {}
-        intent = getattr(self.request, 'intent', None)
-        if intent is not None:
-            if intent.slots is not None:
-                for slot_key in intent.slots.keys():
-                    slot_object = getattr(intent.slots, slot_key)
-                    request_data[slot_object.name] = getattr(slot_object, 'value', None)
+        slots = intent.slots
+        if slots:
+            for slot_object in slots.values():
+                request_data[slot_object.get('name')] = slot_object.get('value')
 
-        else:
-            for param_name in self.request:
-                request_data[param_name] = getattr(self.request, param_name, None)
-
-        for arg_name in arg_names:
-            param_or_slot = mapping.get(arg_name, arg_name)
-            arg_value = request_data.get(param_or_slot)
+        for arg_name, slot_name, convert_func, default_factory in dispatch.bindings:
+            arg_value = request_data.get(slot_name)
             if arg_value is None or arg_value == "":
-                if arg_name in default:
-                    default_value = default[arg_name]
-                    if isinstance(default_value, collections.Callable):
-                        default_value = default_value()
-                    arg_value = default_value
-            elif arg_name in convert:
-                convert_func = convert[arg_name]
+                if default_factory is not None:
+                    arg_value = default_factory()
+            elif convert_func is not None:
                 try:
                     arg_value = convert_func(arg_value)
                 except Exception as e:
@@ -417,25 +1318,182 @@ class Clova(object):
         return arg_values
 
 
+def _copy_state(state):
+    """Returns a copy of the request state, with its own session, for a view function running with a timeout
+    or a prefetch function.
+    """
+    worker_state = ClovaRequestState(state.clova, state.app)
+    for name in ClovaRequestState.__slots__:
+        setattr(worker_state, name, getattr(state, name))
+    worker_state.session = copy.deepcopy(state.session)
+    worker_state.after_response = None
+    return worker_state
+
+
+def _adopt_state(state, worker_state):
+    """Takes over the session and the queued tasks of a view function that returned in time."""
+    state.session = worker_state.session
+    state.convert_errors = worker_state.convert_errors
+    if worker_state.after_response:
+        state.after_response = (state.after_response or []) + worker_state.after_response
+
+
+def _log_late_failure(future):
+    """Logs the exception of a view function that failed after its timeout."""
+    if not future.cancelled() and future.exception() is not None:
+        error = future.exception()
+        logger.error("Handler failed after timing out", exc_info=(type(error), error, error.__traceback__))
+
+
+def _session_ended_default():
+    return "{}", 200
+
+
+def _run_sync(result):
+    """Runs the coroutine of an `async def` handler to completion, other results are returned as is."""
+    if not inspect.isawaitable(result):
+        return result
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(result)
+    finally:
+        loop.close()
+
+
+_dispatch_worker_clova = None
+
+
+def _init_dispatch_worker(clova, app):
+    """Initializes a worker process of dispatch_many, which keeps one request context pushed."""
+    global _dispatch_worker_clova
+    _dispatch_worker_clova = clova, app
+    # the threads of the parent's executors do not survive the fork
+    clova._executor = clova._handler_executor = None
+    app.test_request_context(clova._route or '/', method='POST').push()
+
+
+def _dispatch_worker(payload):
+    clova, app = _dispatch_worker_clova
+    return clova._dispatch_payload(payload, app)
+
+
+_EventDispatch = namedtuple('_EventDispatch', ['view_func', 'background'])
+
+_EVENT_ACK_PREFIX = b'{"version":"0.1.0","sessionAttributes":'
+_EVENT_ACK_SUFFIX = b',"response":{"card":{},"directives":[],"outputSpeech":{}}}'
+_EVENT_ACK = _EVENT_ACK_PREFIX + b'{}' + _EVENT_ACK_SUFFIX
+
+_IntentDispatch = namedtuple('_IntentDispatch', ['view_func', 'arg_names', 'bindings', 'timeout', 'fallback'])
+
+
+def _constant(value):
+    return lambda: value
+
+
+def _freeze(result):
+    if isinstance(result, models._Response):
+        result.freeze()
+    return result
+
+
+def _cache_response(view_func):
+    """Wraps a view function whose response is constant, so that it is only called once."""
+    cache = []
+
+    if inspect.iscoroutinefunction(view_func):
+        async def cached_view_func(*args):
+            if not cache:
+                cache.append(_freeze(await view_func(*args)))
+            return cache[0]
+    else:
+        def cached_view_func(*args):
+            if not cache:
+                cache.append(_freeze(view_func(*args)))
+            return cache[0]
+
+    return cached_view_func
+
+
+def _compile_dispatch(f, mapping=None, convert=None, default=None, view_func=None, timeout=None, fallback=None):
+    """Compiles a view function and its slot options into a frozen dispatch record.
+
+    Each binding is a tuple of (argument name, slot name, converter, default factory),
+    so that the per-request path only has to walk the bindings once.
+    The arguments are read from `f`, which `view_func` may wrap.
+    """
+    mapping = mapping or {}
+    convert = convert or {}
+    default = default or {}
+
+    arg_names = tuple(inspect.getfullargspec(f).args)
+    bindings = []
+    for arg_name in arg_names:
+        default_factory = None
+        if arg_name in default:
+            default_value = default[arg_name]
+            default_factory = default_value if callable(default_value) else _constant(default_value)
+        convert_func = converters.resolve(convert.get(arg_name))
+        bindings.append((arg_name, mapping.get(arg_name, arg_name), convert_func, default_factory))
+
+    return _IntentDispatch(view_func or f, arg_names, tuple(bindings), timeout, fallback)
+
+
 class YamlLoader(BaseLoader):
+    """Loads the templates of an app or blueprint from its yaml file.
+
+    The file is parsed once and Jinja keeps the compiled templates. Whether the file is
+    checked for changes is decided by `CLOVA_TEMPLATE_RELOAD`: True checks on every lookup,
+    a number checks at most once every that many seconds, and False never checks.
+    By default the file is only checked while the app runs in debug mode.
+    """
 
     def __init__(self, app, path):
         self.path = app.root_path + os.path.sep + path
         self.mapping = {}
+        self.last_mtime = None
+        self._next_check = 0
         self._reload_mapping()
 
     def _reload_mapping(self):
-        if os.path.isfile(self.path):
-            self.last_mtime = os.path.getmtime(self.path)
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self.mapping = {}
+            self.last_mtime = None
+            return
+        if mtime != self.last_mtime:
             with open(self.path) as f:
-                self.mapping = yaml.safe_load(f.read())
+                self.mapping = yaml.safe_load(f.read()) or {}
+            self.last_mtime = mtime
+
+    def _reload_interval(self):
+        if not has_app_context():
+            return None
+        reload = current_app.config.get('CLOVA_TEMPLATE_RELOAD')
+        if reload is None:
+            reload = current_app.debug
+        if reload is True:
+            return 0
+        if reload is False:
+            return None
+        return reload
+
+    def _check_for_changes(self):
+        interval = self._reload_interval()
+        if interval is None:
+            return
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + interval
+            self._reload_mapping()
+
+    def _is_up_to_date(self, template, source):
+        self._check_for_changes()
+        return source == self.mapping.get(template)
 
     def get_source(self, environment, template):
-        if not os.path.isfile(self.path):
-            return None, None, None
-        if self.last_mtime != os.path.getmtime(self.path):
-            self._reload_mapping()
+        self._check_for_changes()
         if template in self.mapping:
             source = self.mapping[template]
-            return source, None, lambda: source == self.mapping.get(template)
+            return source, None, lambda: self._is_up_to_date(template, source)
         raise TemplateNotFound(template)
@@ -1,12 +1,234 @@
-class directive:
-    @staticmethod
-    def open_mike():
+from types import MappingProxyType
+from collections.abc import Mapping
+
+from flask import has_app_context
+
+from .core import find_clova
+
+
+def _copy(value):
+    if isinstance(value, Mapping):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy(item) for item in value]
+    return value
+
+
+def _frozen(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _frozen(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_frozen(item) for item in value)
+    return value
+
+
+class Directive(Mapping):
+    """Immutable CEK directive.
+
+    It reads like the dict of the directive, `directive['payload']['explicit']`, with
+    read-only payload mappings. The payload is copied when the directive is built.
+    The JSON of a directive is encoded once, the first time a response containing it is rendered,
+    so prebuilt directives such as `directive.open_mike()` cost nothing to reuse.
+    """
+    __slots__ = ('namespace', 'name', 'payload', '_payload', '_encoded')
+
+    def __init__(self, namespace, name, payload=None):
+        payload = _copy(payload) if payload is not None else {}
+        object.__setattr__(self, 'namespace', namespace)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, '_payload', payload)
+        object.__setattr__(self, 'payload', _frozen(payload))
+        object.__setattr__(self, '_encoded', None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __getitem__(self, key):
+        if key == 'header':
+            return MappingProxyType({"namespace": self.namespace, "name": self.name})
+        if key == 'payload':
+            return self.payload
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(('header', 'payload'))
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        if isinstance(other, Directive):
+            return self.namespace == other.namespace and self.name == other.name and self._payload == other._payload
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.namespace, self.name))
+
+    def __repr__(self):
+        return '{}({!r}, {!r}, {!r})'.format(type(self).__name__, self.namespace, self.name, self._payload)
+
+    def to_dict(self):
+        """Returns the directive as a new, mutable dict."""
         return {
             "header": {
-                "name": "KeepConversation",
-                "namespace": "Clova"
+                "namespace": self.namespace,
+                "name": self.name,
             },
-            "payload": {
-                "explicit": True
-            }
+            "payload": _copy(self._payload),
+        }
+
+    def _encode(self, dumps):
+        encoded = self._encoded
+        if encoded is None:
+            encoded = b''.join((
+                b'{"header":{"namespace":', dumps(self.namespace),
+                b',"name":', dumps(self.name),
+                b'},"payload":', dumps(self._payload), b'}'
+            ))
+            object.__setattr__(self, '_encoded', encoded)
+        return encoded
+
+
+_KEEP_CONVERSATION = Directive('Clova', 'KeepConversation', {'explicit': True})
+
+
+class directive:
+    @staticmethod
+    def open_mike():
+        return _KEEP_CONVERSATION
+
+
+_PAUSE = Directive('PlaybackController', 'Pause')
+_RESUME = Directive('PlaybackController', 'Resume')
+_STOP = Directive('PlaybackController', 'Stop')
+
+
+def progress_report(delay=None, interval=None, position=None):
+    """Returns the progressReport settings of a stream, in milliseconds.
+
+    Keyword Arguments:
+        delay {int} -- send ProgressReportDelayPassed once, after that much playback (default: {None})
+        interval {int} -- send ProgressReportIntervalPassed every that much playback (default: {None})
+        position {int} -- send ProgressReportPositionPassed when playback reaches that position (default: {None})
+    """
+    return {
+        "progressReportDelayInMilliseconds": delay,
+        "progressReportIntervalInMilliseconds": interval,
+        "progressReportPositionInMilliseconds": position,
+    }
+
+
+class AudioPlayer:
+    """Directives and event names of CEK audio playback.
+
+    @clova.intent('PlayMusicIntent')
+    def play_music():
+        return statement(say.Korean('음악을 재생합니다.')).add_directive(
+            AudioPlayer.play('https://example.com/song.mp3', token='song-1', title='노래')
+        )
+
+    The streams given to `play` are remembered in `clova.stream_cache`, keyed by token,
+    so the handlers of later AudioPlayer events can look them up with `AudioPlayer.stream(token)`.
+    """
+    NAMESPACE = 'AudioPlayer'
+
+    # Events sent by CEK in EventRequests of the AudioPlayer namespace
+    PLAY_STARTED = 'PlayStarted'
+    PLAY_PAUSED = 'PlayPaused'
+    PLAY_RESUMED = 'PlayResumed'
+    PLAY_STOPPED = 'PlayStopped'
+    PLAY_FINISHED = 'PlayFinished'
+    PROGRESS_REPORT_DELAY_PASSED = 'ProgressReportDelayPassed'
+    PROGRESS_REPORT_INTERVAL_PASSED = 'ProgressReportIntervalPassed'
+    PROGRESS_REPORT_POSITION_PASSED = 'ProgressReportPositionPassed'
+    STREAM_REQUESTED = 'StreamRequested'
+
+    # playBehavior of Play directives
+    REPLACE_ALL = 'REPLACE_ALL'
+    ENQUEUE = 'ENQUEUE'
+
+    @staticmethod
+    def play(url, token, title=None, artist=None, audio_item_id=None, offset=0, progress=None,
+             play_behavior=REPLACE_ALL, source=None, url_playable=True):
+        """Returns an AudioPlayer.Play directive.
+
+        Arguments:
+            url {str} -- URL of the audio stream
+            token {str} -- token identifying the stream in later AudioPlayer events
+
+        Keyword Arguments:
+            title {str} -- title shown on the device (default: {None})
+            artist {str} -- artist shown on the device (default: {None})
+            audio_item_id {str} -- ID of the audio item (default: {token})
+            offset {int} -- milliseconds to start playback at (default: {0})
+            progress {dict} -- progressReport settings, from `progress_report` (default: {None})
+            play_behavior {str} -- REPLACE_ALL or ENQUEUE (default: {REPLACE_ALL})
+            source {dict} -- name and logoUrl of the content provider (default: {None})
+            url_playable {bool} -- url can be played as is, otherwise the device sends StreamRequested (default: {True})
+        """
+        stream = {
+            "beginAtInMilliseconds": offset,
+            "playType": "NONE",
+            "token": token,
+            "url": url,
+            "urlPlayable": url_playable,
         }
+        if progress is not None:
+            stream["progressReport"] = progress
+        audio_item = {
+            "audioItemId": audio_item_id if audio_item_id is not None else token,
+            "stream": stream,
+        }
+        if title is not None:
+            audio_item["titleText"] = title
+        if artist is not None:
+            audio_item["artist"] = artist
+        payload = {"audioItem": audio_item, "playBehavior": play_behavior}
+        if source is not None:
+            payload["source"] = source
+
+        _remember_stream(token, audio_item)
+        return Directive(AudioPlayer.NAMESPACE, 'Play', payload)
+
+    @staticmethod
+    def stream_deliver(url, token, audio_item_id=None, offset=0, progress=None):
+        """Returns an AudioPlayer.StreamDeliver directive, the answer to a StreamRequested event."""
+        stream = {
+            "beginAtInMilliseconds": offset,
+            "playType": "NONE",
+            "token": token,
+            "url": url,
+            "urlPlayable": True,
+        }
+        if progress is not None:
+            stream["progressReport"] = progress
+        return Directive(AudioPlayer.NAMESPACE, 'StreamDeliver', {
+            "audioItemId": audio_item_id if audio_item_id is not None else token,
+            "audioStream": stream,
+        })
+
+    @staticmethod
+    def pause():
+        return _PAUSE
+
+    @staticmethod
+    def resume():
+        return _RESUME
+
+    @staticmethod
+    def stop():
+        return _STOP
+
+    @staticmethod
+    def stream(token):
+        """Returns the audioItem last played with this token, if it is still in `clova.stream_cache`."""
+        return find_clova().stream_cache.get(token)
+
+
+def _remember_stream(token, audio_item):
+    if has_app_context():
+        clova = find_clova()
+        if clova is not None and clova.stream_cache is not None:
+            clova.stream_cache.set(token, audio_item)
@@ -0,0 +1,85 @@
+"""
+Timing instrumentation of the CEK dispatch path.
+
+    histogram = TimingHistogram()
+    clova.on_timing(histogram)
+
+    @app.route('/metrics')
+    def metrics():
+        return histogram.render(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
+"""
+import bisect
+import threading
+from time import perf_counter_ns
+
+
+class StageTimer(object):
+    """Accumulates the nanoseconds spent in each stage of a request."""
+    __slots__ = ('stages', '_last')
+
+    def __init__(self):
+        self.stages = {}
+        self._last = perf_counter_ns()
+
+    def mark(self, stage):
+        """Ends `stage`, which started at the previous mark."""
+        now = perf_counter_ns()
+        self.stages[stage] = self.stages.get(stage, 0) + now - self._last
+        self._last = now
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class TimingHistogram(object):
+    """Prometheus-style histogram of stage durations, labelled by stage, request type and intent name.
+
+    Instances are timing callbacks, register them with `clova.on_timing`.
+
+    Keyword Arguments:
+        name {str} -- metric name (default: {'clova_stage_duration_seconds'})
+        buckets {tuple} -- upper bounds of the buckets in seconds (default: {DEFAULT_BUCKETS})
+    """
+    DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+    def __init__(self, name='clova_stage_duration_seconds', buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage, duration_ns, request_type, intent_name):
+        self.observe(stage, duration_ns / 1e9, request_type, intent_name)
+
+    def observe(self, stage, seconds, request_type=None, intent_name=None):
+        key = (stage, request_type or '', intent_name or '')
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self):
+        """Returns the histogram in the Prometheus text exposition format."""
+        lines = [
+            '# HELP {} Time spent in each stage of CEK requests.'.format(self.name),
+            '# TYPE {} histogram'.format(self.name),
+        ]
+        with self._lock:
+            series = sorted((key, [list(value[0]), value[1], value[2]]) for key, value in self._series.items())
+
+        for (stage, request_type, intent_name), (counts, total, count) in series:
+            labels = 'stage="{}",request_type="{}",intent="{}"'.format(
+                _escape(stage), _escape(request_type), _escape(intent_name)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(self.name, labels, bound, cumulative))
+            lines.append('{}_sum{{{}}} {}'.format(self.name, labels, total))
+            lines.append('{}_count{{{}}} {}'.format(self.name, labels, count))
+        return '\n'.join(lines) + '\n'
@@ -1,5 +1,7 @@
-from flask import json
-from .core import session, context, dbgdump
+from .core import dbgdump, find_clova
+
+
+_missing = object()
 
 
 class _Field(dict):
@@ -9,7 +11,8 @@ class _Field(dict):
     to be accessed via dot notation or as a dict key-value.
 
     Parameters within the request_json that contain their data as a json object
-    are also represented as a _Field object.
+    are also represented as a _Field object. They are wrapped lazily, the first
+    time they are accessed, so subtrees a handler never reads are never copied.
 
     Example:
 
@@ -23,67 +26,141 @@ class _Field(dict):
 
     def __init__(self, request_json={}):
         super(_Field, self).__init__(request_json)
-        for key, value in request_json.items():
-            if isinstance(value, dict):
-                value = _Field(value)
-            self[key] = value
+
+    def _wrap(self, key, value):
+        if type(value) is dict:
+            value = _Field(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __getitem__(self, key):
+        return self._wrap(key, dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        value = dict.get(self, key, _missing)
+        if value is _missing:
+            return default
+        return self._wrap(key, value)
+
+    def values(self):
+        return [self._wrap(key, value) for key, value in dict.items(self)]
+
+    def items(self):
+        return [(key, self._wrap(key, value)) for key, value in dict.items(self)]
 
     def __getattr__(self, attr):
-        return self.get(attr)
+        value = dict.get(self, attr)
+        if type(value) is dict:
+            value = _Field(value)
+            dict.__setitem__(self, attr, value)
+        return value
 
     def __setattr__(self, key, value):
         self.__setitem__(key, value)
 
 
 class _Response(object):
+    """Builder of a CEK response.
+
+    The parts of the response are recorded as given and encoded to JSON bytes in a
+    single pass when the response is rendered, without building a dict tree first.
+    """
 
     def __init__(self, speech):
-        self._response = {
+        self._frozen = False
+        self._encoded = {}
+        self._speech = [speech]
+        self._directives = []
+        self._reprompt = None
+        self._can_fulfill = None
+        self._should_end_session = None
+
+    @property
+    def _response(self):
+        """The response as a dict, as it is encoded by render_response."""
+        response = {
             'card': {},
-            'directives': [],
-            'outputSpeech':
-                {
-                    'type': 'SimpleSpeech',
-                    'values': _output_speech(speech)
-                }
+            'directives': [_directive_dict(directive) for directive in self._directives],
+            'outputSpeech': _output_speech(self._speech),
         }
+        if self._should_end_session is not None:
+            response['shouldEndSession'] = self._should_end_session
+        if self._reprompt is not None:
+            response['reprompt'] = {'outputSpeech': _output_speech([self._reprompt])}
+        if self._can_fulfill is not None:
+            response['canFulfillIntent'] = self._can_fulfill
+        return response
 
     def add_speech(self, speech):
-        return self._add(_output_speech(speech))
+        self._assert_mutable()
+        self._speech.append(speech)
+        return self
 
-    def _add(self, value):
-        self._response['outputSpeech']['type'] = 'SpeechList'
-        values = self._response['outputSpeech']['values']
-        if not isinstance(values, list):
-            values = [values]
+    def freeze(self):
+        """Marks the response as constant.
 
-        values.append(value)
-        self._response['outputSpeech']['values'] = values
+        Its JSON is encoded once, on the first render, and only the sessionAttributes
+        of the current session are encoded on each later render.
+        A frozen response cannot be modified anymore.
+        """
+        self._frozen = True
         return self
 
+    def _assert_mutable(self):
+        if self._frozen:
+            raise TypeError("A frozen response cannot be modified")
+
+    def _encode(self, dumps):
+        parts = [b'{"card":{},"directives":[']
+        for i, directive in enumerate(self._directives):
+            if i:
+                parts.append(b',')
+            parts.append(_encode_directive(directive, dumps))
+        parts.append(b'],"outputSpeech":')
+        _encode_output_speech(parts, self._speech, dumps)
+        if self._should_end_session is not None:
+            parts.append(b',"shouldEndSession":true' if self._should_end_session else b',"shouldEndSession":false')
+        if self._reprompt is not None:
+            parts.append(b',"reprompt":{"outputSpeech":')
+            _encode_output_speech(parts, [self._reprompt], dumps)
+            parts.append(b'}')
+        if self._can_fulfill is not None:
+            parts.append(b',"canFulfillIntent":')
+            parts.append(dumps(self._can_fulfill))
+        parts.append(b'}')
+        return b''.join(parts)
+
     def render_response(self):
-        sessionAttributes = session.sessionAttributes
-        if sessionAttributes is None:
-            sessionAttributes = {}
-
-        response_wrapper = {
-            'version': '0.1.0',
-            'response': self._response,
-            'sessionAttributes': sessionAttributes
-        }
-        dbgdump(response_wrapper)
+        clova = find_clova()
+        sessionAttributes = clova._response_session_attributes()
+
+        json_codec = clova.json_codec
+        if self._frozen:
+            response = self._encoded.get(json_codec.name)
+            if response is None:
+                response = self._encoded[json_codec.name] = self._encode(json_codec.dumps)
+        else:
+            response = self._encode(json_codec.dumps)
+
+        response_body = b''.join((
+            b'{"version":"0.1.0","response":', response,
+            b',"sessionAttributes":', json_codec.dumps(sessionAttributes), b'}'
+        ))
+        dbgdump(response_body)
+
+        return response_body
 
-        return json.dumps(response_wrapper)
-    
     def add_can_fulfill(self, can_fulfill: bool, score: float):
-        self._response['canFulfillIntent'] = {
+        self._assert_mutable()
+        self._can_fulfill = {
             "canFulfill": "YES" if can_fulfill else "NO",
             "confidenceScore": str(score),
         }
         return self
 
     def add_directive(self, directive):
-        self._response['directives'].append(directive)
+        self._assert_mutable()
+        self._directives.append(directive)
         return self
 
 
@@ -92,7 +169,7 @@ class statement(_Response):
     def __init__(self, speech):
         super(statement, self).__init__(speech)
 
-        self._response['shouldEndSession'] = True
+        self._should_end_session = True
 
 
 class question(_Response):
@@ -100,19 +177,14 @@ class question(_Response):
     def __init__(self, speech):
         super(question, self).__init__(speech)
 
-        self._response['shouldEndSession'] = False
+        self._should_end_session = False
 
     def reprompt(self, reprompt):
         """
         Only support repromt type SimpleSpeech now
         """
-        reprompt = {
-            'outputSpeech': {
-                'type': 'SimpleSpeech',
-                'values': _output_speech(reprompt)
-            }
-        }
-        self._response['reprompt'] = reprompt
+        self._assert_mutable()
+        self._reprompt = reprompt
         return self
 
     def reprompt_add(self):
@@ -136,4 +208,41 @@ def _copyattr(src, dest, attr, convert=None):
 
 
 def _output_speech(speech):
-    return speech.render_template()
\ No newline at end of file
+    if len(speech) == 1:
+        return {'type': 'SimpleSpeech', 'values': speech[0].render_template()}
+    return {'type': 'SpeechList', 'values': [value.render_template() for value in speech]}
+
+
+def _encode_output_speech(parts, speech, dumps):
+    if len(speech) == 1:
+        parts.append(b'{"type":"SimpleSpeech","values":')
+        parts.append(_encode_speech(speech[0], dumps))
+    else:
+        parts.append(b'{"type":"SpeechList","values":[')
+        for i, value in enumerate(speech):
+            if i:
+                parts.append(b',')
+            parts.append(_encode_speech(value, dumps))
+        parts.append(b']')
+    parts.append(b'}')
+
+
+def _encode_speech(speech, dumps):
+    encode = getattr(speech, '_encode', None)
+    if encode is None:
+        return dumps(speech.render_template())
+    return encode(dumps)
+
+
+def _directive_dict(directive):
+    to_dict = getattr(directive, 'to_dict', None)
+    if to_dict is None:
+        return directive
+    return to_dict()
+
+
+def _encode_directive(directive, dumps):
+    encode = getattr(directive, '_encode', None)
+    if encode is None:
+        return dumps(directive)
+    return encode(dumps)
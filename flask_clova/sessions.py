@@ -0,0 +1,153 @@
+"""
+Server-side stores for session attributes.
+
+With a store, the sessionAttributes of a session are kept on the server, keyed by
+session.sessionId, and only a short reference travels in the CEK requests and responses.
+
+    clova = Clova(app, '/', session_store=MemorySessionStore(ttl=600))
+
+Stores keep the attributes as encoded JSON bytes, Clova encodes and decodes them
+with its JSON codec and only saves them when a handler changed them.
+"""
+import time
+import queue
+import sqlite3
+import threading
+
+from .cache import LRUCache
+
+
+class SessionStore(object):
+    """Interface of session attribute stores."""
+
+    def load(self, session_id):
+        """Returns the encoded attributes of the session, or None."""
+        raise NotImplementedError
+
+    def save(self, session_id, data):
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Keeps sessions in process memory, in an LRU cache.
+
+    Keyword Arguments:
+        maxsize {int} -- maximum number of sessions (default: {10000})
+        ttl {float} -- seconds a session is kept after its last save (default: {3600})
+    """
+
+    def __init__(self, maxsize=10000, ttl=3600):
+        self._cache = LRUCache(maxsize, ttl)
+
+    def load(self, session_id):
+        return self._cache.get(session_id)
+
+    def save(self, session_id, data):
+        self._cache.set(session_id, data)
+
+    def delete(self, session_id):
+        self._cache.delete(session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Keeps sessions in a SQLite database file, shared by the worker processes of a host.
+
+    Keyword Arguments:
+        path {str} -- path to the database file (default: {'clova_sessions.db'})
+        ttl {float} -- seconds a session is kept after its last save (default: {3600})
+        write_behind {bool} -- save from a background thread, so requests do not wait
+            on the disk. Loads see pending saves of the same process (default: {False})
+        purge_interval {float} -- seconds between deletions of expired sessions, which are
+            done by the next save (default: {300})
+    """
+
+    def __init__(self, path='clova_sessions.db', ttl=3600, write_behind=False, purge_interval=300):
+        self.path = path
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._next_purge = time.monotonic() + purge_interval
+        self._local = threading.local()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._queue = None
+
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS clova_sessions '
+                '(session_id TEXT PRIMARY KEY, data BLOB, expires REAL)'
+            )
+
+        if write_behind:
+            self._queue = queue.Queue()
+            writer = threading.Thread(target=self._write_behind, name='clova-session-writer')
+            writer.daemon = True
+            writer.start()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path)
+        return connection
+
+    def load(self, session_id):
+        with self._pending_lock:
+            if session_id in self._pending:
+                return self._pending[session_id]
+
+        row = self._connection().execute(
+            'SELECT data FROM clova_sessions WHERE session_id = ? AND expires > ?',
+            (session_id, time.time())
+        ).fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    def save(self, session_id, data):
+        if self._queue is None:
+            self._write(session_id, data)
+            return
+        with self._pending_lock:
+            self._pending[session_id] = data
+        self._queue.put(session_id)
+
+    def delete(self, session_id):
+        self.save(session_id, None)
+
+    def flush(self):
+        """Blocks until all pending saves are written."""
+        if self._queue is not None:
+            self._queue.join()
+
+    def purge(self):
+        """Deletes the expired sessions, whose SessionEndedRequest never arrived."""
+        with self._connection() as connection:
+            connection.execute('DELETE FROM clova_sessions WHERE expires <= ?', (time.time(),))
+
+    def _write(self, session_id, data):
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + self.purge_interval
+            self.purge()
+        with self._connection() as connection:
+            if data is None:
+                connection.execute('DELETE FROM clova_sessions WHERE session_id = ?', (session_id,))
+            else:
+                connection.execute(
+                    'INSERT OR REPLACE INTO clova_sessions VALUES (?, ?, ?)',
+                    (session_id, data, time.time() + self.ttl)
+                )
+
+    def _write_behind(self):
+        while True:
+            session_id = self._queue.get()
+            try:
+                with self._pending_lock:
+                    if session_id not in self._pending:
+                        continue
+                    data = self._pending[session_id]
+                self._write(session_id, data)
+                with self._pending_lock:
+                    if self._pending.get(session_id, data) is data:
+                        self._pending.pop(session_id, None)
+            finally:
+                self._queue.task_done()
@@ -21,25 +21,62 @@ class say:
     def Link(link):
         return SpeechLink(link)
 
-class SpeechText:
+
+class _Speech(object):
+    """Immutable speech value.
+
+    The JSON of a speech is encoded once, the first time a response containing it is rendered.
+    """
+    __slots__ = ('value', 'lang', '_encoded')
+    _type = None
+
     def __init__(self, value, lang):
-        self.value = value
-        self.lang  = lang
+        object.__setattr__(self, 'value', value)
+        object.__setattr__(self, 'lang', lang)
+        object.__setattr__(self, '_encoded', None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.value == other.value and self.lang == other.lang
+
+    def __hash__(self):
+        return hash((type(self), self.value, self.lang))
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(type(self).__name__, self.value, self.lang)
 
     def render_template(self):
         return {
-            "type": "PlainText",
+            "type": self._type,
             "lang": self.lang,
             "value": self.value,
         }
 
-class SpeechLink:
+    def _encode(self, dumps):
+        encoded = self._encoded
+        if encoded is None:
+            encoded = b''.join((
+                b'{"type":"', self._type.encode('ascii'),
+                b'","lang":', dumps(self.lang),
+                b',"value":', dumps(self.value), b'}'
+            ))
+            object.__setattr__(self, '_encoded', encoded)
+        return encoded
+
+
+class SpeechText(_Speech):
+    __slots__ = ()
+    _type = "PlainText"
+
+
+class SpeechLink(_Speech):
+    __slots__ = ()
+    _type = "URL"
+
     def __init__(self, value):
-        self.value = value
+        super(SpeechLink, self).__init__(value, "")
 
-    def render_template(self):
-        return {
-            "type": "URL",
-            "lang": "",
-            "value": self.value
-        }
\ No newline at end of file
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.value)
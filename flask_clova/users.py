@@ -0,0 +1,82 @@
+"""
+Per-user cache for data handlers load from slow backends, such as profiles,
+linked account data and preferences.
+
+    @clova.user_cache.loader
+    def load_profile(user_id):
+        return profiles.fetch(user_id)
+
+    @clova.intent('HelloIntent')
+    def hello():
+        profile = clova.user_cache.get()
+"""
+from .cache import LRUCache
+from .core import find_clova
+
+
+class UserCache(object):
+    """Caches one value per CEK user, keyed by the userId of `context.System.user`.
+
+    An entry is only valid for the accessToken it was stored with, so linking or
+    relinking an account invalidates the user's entry.
+
+    Keyword Arguments:
+        store {LRUCache} -- store of (accessToken, value) entries, anything with get, set and delete
+            (default: {LRUCache(maxsize, ttl)})
+        maxsize {int} -- maximum number of users in the default store (default: {10000})
+        ttl {float} -- seconds an entry of the default store stays valid (default: {300})
+        loader {callable} -- called with the user ID on a miss, its result is cached (default: {None})
+    """
+
+    def __init__(self, store=None, maxsize=10000, ttl=300, loader=None):
+        self.store = store if store is not None else LRUCache(maxsize, ttl)
+        self._loader = loader
+
+    def loader(self, f):
+        """Decorator registering the function loading a user's value on a cache miss."""
+        self._loader = f
+
+        return f
+
+    def get(self, user_id=None, access_token=None):
+        """Returns the value of the user, the user of the current request by default.
+
+        On a miss, the value is loaded with the loader and cached, or None is returned without a loader.
+        """
+        if user_id is None:
+            user_id, access_token = _current_user()
+            if user_id is None:
+                return None
+
+        entry = self.store.get(user_id)
+        if entry is not None and entry[0] == access_token:
+            return entry[1]
+        if self._loader is None:
+            return None
+
+        value = self._loader(user_id)
+        self.store.set(user_id, (access_token, value))
+        return value
+
+    def set(self, value, user_id=None, access_token=None):
+        """Stores the value of the user, the user of the current request by default.
+
+        Nothing is stored for requests without a userId.
+        """
+        if user_id is None:
+            user_id, access_token = _current_user()
+            if user_id is None:
+                return
+        self.store.set(user_id, (access_token, value))
+
+    def invalidate(self, user_id=None):
+        if user_id is None:
+            user_id = _current_user()[0]
+            if user_id is None:
+                return
+        self.store.delete(user_id)
+
+
+def _current_user():
+    clova = find_clova()
+    return clova._get_user(), clova._get_access_token()
@@ -1,6 +1,105 @@
+import base64
+import hashlib
+import threading
+from collections.abc import Iterable
+
+from .cache import LRUCache
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+except ImportError:
+    load_pem_public_key = None
+
+CEK_PUBLIC_KEY_URL = 'https://clova-cek-requests.line.me/.well-known/signature-public-key.pem'
+
+
 class VerificationError(Exception): pass
 
 
+def normalize_application_ids(records):
+    """Converts `CLOVA_APPLICATION_ID`, a single application ID or a collection of them, into a frozenset."""
+    if records is None:
+        return None
+    if isinstance(records, (str, bytes)) or not isinstance(records, Iterable):
+        return frozenset([records])
+    return frozenset(records)
+
+
 def verify_application_id(candidate, records):
     if candidate not in records:
-        raise VerificationError("Application ID verification failed")
\ No newline at end of file
+        raise VerificationError("Application ID verification failed")
+
+
+def fetch_public_key(url=CEK_PUBLIC_KEY_URL, timeout=5):
+    """Downloads the PEM encoded public key CEK signs its requests with."""
+    from urllib.request import urlopen
+
+    with urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def load_public_key(pem):
+    return load_pem_public_key(pem, backend=default_backend())
+
+
+class SignatureVerifier(object):
+    """Verifies the SignatureCEK header of CEK requests. Requires the cryptography package.
+
+    The public key is loaded once, on first use, and the parsed key is kept for the
+    lifetime of the verifier. Bodies whose signature was already verified are
+    remembered, so retried identical requests skip the RSA operation.
+
+    Keyword Arguments:
+        key_path {str} -- path to a PEM public key file, instead of downloading it (default: {None})
+        fetcher {callable} -- returns the PEM public key bytes (default: {fetch_public_key})
+        cache_size {int} -- number of verified (body, signature) digests to remember, 0 to disable (default: {1024})
+    """
+
+    def __init__(self, key_path=None, fetcher=None, cache_size=1024):
+        if load_pem_public_key is None:
+            raise ImportError("cryptography is required to verify request signatures")
+        self.key_path = key_path
+        self.fetcher = fetcher or fetch_public_key
+        self._public_key = None
+        self._lock = threading.Lock()
+        self._verified = LRUCache(cache_size) if cache_size else None
+
+    @property
+    def public_key(self):
+        if self._public_key is None:
+            with self._lock:
+                if self._public_key is None:
+                    if self.key_path is not None:
+                        with open(self.key_path, 'rb') as f:
+                            pem = f.read()
+                    else:
+                        pem = self.fetcher()
+                    self._public_key = load_public_key(pem)
+        return self._public_key
+
+    def verify(self, body, signature):
+        if not signature:
+            raise VerificationError("SignatureCEK header is missing")
+
+        cache_key = None
+        if self._verified is not None:
+            cache_key = (hashlib.sha256(body).digest(), signature)
+            if cache_key in self._verified:
+                return
+
+        try:
+            decoded_signature = base64.b64decode(signature)
+        except ValueError:
+            raise VerificationError("SignatureCEK header is not valid base64")
+
+        try:
+            self.public_key.verify(decoded_signature, body, padding.PKCS1v15(), hashes.SHA256())
+        except InvalidSignature:
+            raise VerificationError("Request signature verification failed")
+
+        if cache_key is not None:
+            self._verified.set(cache_key, True)
@@ -0,0 +1,56 @@
+"""
+Bounded worker pool running work off the request path, such as background event handlers.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import logger
+
+
+class BoundedExecutor(object):
+    """Thread pool with a bounded number of pending tasks.
+
+    When `queue_size` tasks are already queued or running, submit runs the task in the
+    calling thread instead, which slows producers down rather than growing the queue without bound.
+
+    Keyword Arguments:
+        max_workers {int} -- number of worker threads (default: {4})
+        queue_size {int} -- maximum number of queued and running tasks (default: {1000})
+    """
+
+    def __init__(self, max_workers=4, queue_size=1000):
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='clova-worker')
+        self._slots = threading.BoundedSemaphore(queue_size)
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedules fn(*args, **kwargs) and returns its Future. Failures are logged."""
+        if not self._slots.acquire(blocking=False):
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            _log_failure(future)
+            return future
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self._slots.release()
+        _log_failure(future)
+
+    def shutdown(self, wait=True):
+        """Stops accepting tasks, and waits for the queued ones to finish if `wait` is set."""
+        self._executor.shutdown(wait=wait)
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        error = future.exception()
+        logger.error("Background task failed", exc_info=(type(error), error, error.__traceback__))
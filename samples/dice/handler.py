@@ -36,14 +36,17 @@ def throw_handler(dice_cnt):
         .add_speech(say.Korean(result_text))
 
 
-@clova.intent('Clova.GuideIntent')
+@clova.intent('Clova.GuideIntent', cache_response=True)
 def guide_intent():
     return question(say.Korean("주사위 한 개 던져줘, 라고 시도해보세요."))
 
 
+goodbye = statement(say.Korean("주사위 놀이 익스텐션을 종료합니다.")).freeze()
+
+
 @clova.session_ended
 def session_ended():
-    return statement(say.Korean("주사위 놀이 익스텐션을 종료합니다."))
+    return goodbye
 
 
 def get_answer(dice_cnt):
@@ -18,6 +18,12 @@ setup(
     author_email='hollal0726@gmail.com',
     packages=['flask_clova'],
     install_requires=setup_requires,
+    extras_require={
+        'orjson': ['orjson'],
+        'ujson': ['ujson'],
+        'signature': ['cryptography'],
+        'brotli': ['brotli'],
+    },
     test_requires=[
         'mock',
         'requests'
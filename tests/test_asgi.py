@@ -0,0 +1,160 @@
+import asyncio
+import json
+import time
+import unittest
+
+from flask import Flask, request as flask_request
+from flask_clova import Clova, request, statement, say
+from flask_clova.asgi import ClovaASGI
+from flask_clova.verifier import VerificationError
+
+
+def intent_request(value):
+    return {
+        "version": "0.1.0",
+        "session": {},
+        "context": {},
+        "request": {
+            "type": "IntentRequest",
+            "intent": {
+                "name": "EchoIntent",
+                "slots": {
+                    "value": {"name": "value", "value": value}
+                }
+            }
+        }
+    }
+
+
+async def call(app, method, path, body=b''):
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'headers': [(b'content-type', b'application/json')],
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]['status'], sent[1]['body']
+
+
+class ASGITest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask('__TEST_ASGI__')
+        self.app.config['CLOVA_VERIFY_REQUESTS'] = False
+        self.clova = Clova(app=self.app, route="/clova")
+        self.asgi = ClovaASGI(self.clova)
+
+        @self.clova.intent('EchoIntent')
+        async def echo(value):
+            await asyncio.sleep(0.2)
+            self.assertEqual(request.intent.slots.value.value, value)
+            return statement(say.English(value))
+
+    def test_concurrent_requests(self):
+        async def run():
+            return await asyncio.gather(*[
+                call(self.asgi, 'POST', '/clova', json.dumps(intent_request(str(i))).encode('utf-8'))
+                for i in range(5)
+            ])
+
+        started = time.time()
+        responses = asyncio.run(run())
+        self.assertLess(time.time() - started, 0.2 * 5)
+
+        for i, (status, body) in enumerate(responses):
+            self.assertEqual(status, 200)
+            speech = json.loads(body.decode('utf-8'))['response']['outputSpeech']['values']
+            self.assertEqual(speech['value'], str(i))
+
+    def test_errors(self):
+        @self.clova.intent('FailIntent')
+        def fail():
+            raise KeyError('backend')
+
+        @self.app.errorhandler(VerificationError)
+        def verification_failed(e):
+            return 'Forbidden', 403
+
+        fail_request = intent_request('x')
+        fail_request['request']['intent']['name'] = 'FailIntent'
+        status, body = asyncio.run(call(self.asgi, 'POST', '/clova', json.dumps(fail_request).encode('utf-8')))
+        self.assertEqual(status, 500)
+        self.assertIn(b'Internal Server Error', body)
+
+        self.app.config['CLOVA_VERIFY_REQUESTS'] = True
+        self.app.config['CLOVA_APPLICATION_ID'] = 'com.example.other'
+        echo_request = intent_request('x')
+        echo_request['context'] = {'System': {'application': {'applicationId': 'com.example.extension'}}}
+        status, body = asyncio.run(call(self.asgi, 'POST', '/clova', json.dumps(echo_request).encode('utf-8')))
+        self.assertEqual((status, body), (403, b'Forbidden'))
+
+    def test_handler_timeout(self):
+        @self.clova.intent('SlowIntent', timeout=0.05, fallback=statement(say.English('later')))
+        async def slow():
+            await asyncio.sleep(1)
+            return statement(say.English('slow'))
+
+        slow_request = intent_request('x')
+        slow_request['request']['intent']['name'] = 'SlowIntent'
+        status, body = asyncio.run(call(self.asgi, 'POST', '/clova', json.dumps(slow_request).encode('utf-8')))
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body.decode('utf-8'))['response']['outputSpeech']['values']['value'], 'later')
+        self.clova.shutdown(wait=False)
+
+    def test_request_context(self):
+        hooks = []
+
+        @self.app.before_request
+        def before_request():
+            hooks.append('before_request')
+
+        @self.app.after_request
+        def after_request(response):
+            hooks.append('after_request')
+            response.headers['X-Hook'] = 'after'
+            return response
+
+        @self.app.teardown_request
+        def teardown_request(error):
+            hooks.append('teardown_request')
+
+        @self.clova.intent('RemoteIntent')
+        def remote():
+            return statement(say.English('{} {} {}'.format(
+                flask_request.scheme, flask_request.remote_addr, flask_request.args['lang']
+            )))
+
+        remote_request = intent_request('x')
+        remote_request['request']['intent']['name'] = 'RemoteIntent'
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            return {'type': 'http.request', 'body': json.dumps(remote_request).encode('utf-8')}
+
+        scope = {
+            'type': 'http', 'method': 'POST', 'path': '/clova', 'scheme': 'https',
+            'query_string': b'lang=ko', 'client': ('10.0.0.5', 51234), 'server': ('example.com', 443),
+            'headers': [(b'content-type', b'application/json')],
+        }
+        asyncio.run(self.asgi(scope, receive, send))
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'x-hook', b'after'), [(key.lower(), value) for key, value in sent[0]['headers']])
+        speech = json.loads(sent[1]['body'].decode('utf-8'))['response']['outputSpeech']['values']
+        self.assertEqual(speech['value'], 'https 10.0.0.5 ko')
+        self.assertEqual(hooks, ['before_request', 'after_request', 'teardown_request'])
+
+    def test_routing(self):
+        self.assertEqual(asyncio.run(call(self.asgi, 'POST', '/other'))[0], 404)
+        self.assertEqual(asyncio.run(call(self.asgi, 'GET', '/clova'))[0], 405)
@@ -0,0 +1,21 @@
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+
+from flask_clova import bench
+
+
+class BenchTest(unittest.TestCase):
+    def test_generate_payloads(self):
+        payloads = bench.generate_payloads(50, session_size=4)
+        request_types = set(json.loads(payload.decode('utf-8'))['request']['type'] for payload in payloads)
+        self.assertEqual(request_types, {'LaunchRequest', 'IntentRequest', 'SessionEndedRequest'})
+        self.assertEqual(payloads, bench.generate_payloads(50, session_size=4))
+
+    def test_main(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            bench.main(['--requests', '20'])
+        for name in bench.STAGES + ('client', 'wsgi'):
+            self.assertIn(name, output.getvalue())
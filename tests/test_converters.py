@@ -0,0 +1,69 @@
+import enum
+import datetime
+import unittest
+
+from flask_clova import converters
+
+
+class ConvertersTest(unittest.TestCase):
+    def test_korean_number(self):
+        cases = {
+            '한 개': 1, '두 개': 2, '열두 개': 12, '스물다섯': 25, '삼십오': 35,
+            '백이십': 120, '이만 삼천': 23000, '3개': 3, '2만5천': 25000, '일곱 번': 7,
+            '두 사람': 2, '한 사람': 1, '둘이서': 2, '세 사람이': 3, '1,000원': 1000,
+            '두개': 2, '3일': 3, '오분': 5,
+        }
+        for value, expected in cases.items():
+            self.assertEqual(converters.korean_number(value), expected, value)
+        for value in ('개', '사람', '오늘', '이것', '한국', '서울', '네이버', '3.5', '3.5개'):
+            with self.assertRaises(ValueError):
+                converters.korean_number(value)
+
+    def test_integer(self):
+        self.assertEqual(converters.integer('42'), 42)
+        self.assertEqual(converters.integer('마흔두 개'), 42)
+        for value in ('3.5', '12abc', '1e3', '12 abc'):
+            with self.assertRaises(ValueError):
+                converters.integer(value)
+
+    def test_boolean(self):
+        self.assertTrue(converters.boolean('네'))
+        self.assertFalse(converters.boolean('아니요'))
+        self.assertTrue(converters.boolean('Yes'))
+        with self.assertRaises(ValueError):
+            converters.boolean('글쎄')
+
+    def test_date_and_duration(self):
+        self.assertEqual(converters.date('2018-07-14'), datetime.date(2018, 7, 14))
+        self.assertEqual(converters.duration('PT1H30M'), datetime.timedelta(hours=1, minutes=30))
+        self.assertEqual(converters.duration('한 시간 반'), datetime.timedelta(hours=1, minutes=30))
+        self.assertEqual(converters.duration('10분 30초'), datetime.timedelta(minutes=10, seconds=30))
+        self.assertEqual(converters.duration('1.5시간'), datetime.timedelta(hours=1, minutes=30))
+        for value in ('PT', '반', '3시간 뭐'):
+            with self.assertRaises(ValueError):
+                converters.duration(value)
+
+    def test_enum(self):
+        class Color(enum.Enum):
+            RED = '빨강'
+            BLUE = '파랑'
+
+        convert = converters.enum(Color)
+        self.assertIs(convert('빨강'), Color.RED)
+        self.assertIs(convert('BLUE'), Color.BLUE)
+        with self.assertRaises(ValueError):
+            convert('초록')
+        with self.assertRaises(ValueError):
+            converters.enum({1: 'one', 'two': 2})('three')
+
+    def test_memoization(self):
+        converters.korean_number('스물다섯')
+        hits = converters.korean_number.cache_info().hits
+        converters.korean_number('스물다섯')
+        self.assertEqual(converters.korean_number.cache_info().hits, hits + 1)
+
+    def test_resolve(self):
+        self.assertIs(converters.resolve('korean_number'), converters.korean_number)
+        self.assertIs(converters.resolve(int), int)
+        with self.assertRaises(ValueError):
+            converters.resolve('unknown')
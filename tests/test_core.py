@@ -1,9 +1,19 @@
+import os
+import gzip
+import json
+import decimal
+import datetime
+import logging
+import tempfile
+import threading
 import unittest
 import six
 import mock
 
-from flask import Flask
-from flask_clova import Clova, session, request
+from flask import Flask, Blueprint, render_template, request as flask_request
+from flask_clova import codec, Clova, session, request, context, convert_errors, statement, question, say
+from flask_clova.core import find_clova, request_state
+from flask_clova.sessions import MemorySessionStore
 
 @unittest.skipIf(six.PY2, "Not yet supported on Python 2.x")
 class SmokeTestUsingSamples(unittest.TestCase):
@@ -120,6 +130,703 @@ class SmokeTestUsingSamples(unittest.TestCase):
 
         self.assertEqual(counter.call_count, 1)
 
+    def test_default_intent_slot_arguments(self):
+        counter = mock.MagicMock()
+        @self.clova.default_intent
+        def default_intent(count, missing):
+            self.assertEqual(count, 'two')
+            self.assertIsNone(missing)
+            counter()
+            return "ok"
+
+        @self.clova.intent('convert_intent', convert={'count': int})
+        def convert_intent(count):
+            self.assertEqual(count, 'two')
+            self.assertIsInstance(convert_errors['count'], ValueError)
+            counter()
+            return "ok"
+
+        @self.clova.intent('builtin_convert_intent', convert={'count': 'korean_number'})
+        def builtin_convert_intent(count):
+            self.assertEqual(count, 2)
+            counter()
+            return "ok"
+
+        req = {
+            "version": "0.1.0",
+            "session": {},
+            "context": {},
+            "request": {
+                "type": "IntentRequest",
+                "intent": {
+                    "name": "unknown_intent",
+                    "slots": {
+                        'count': {
+                            'name': 'count',
+                            'value': 'two'
+                        }
+                    }
+                }
+            }
+        }
+        with self.app.test_client() as client:
+            rv = client.post('/', json=req)
+            self.assertEqual('200 OK', rv.status)
+
+            req['request']['intent']['name'] = 'convert_intent'
+            rv = client.post('/', json=req)
+            self.assertEqual('200 OK', rv.status)
+
+            req['request']['intent']['name'] = 'builtin_convert_intent'
+            req['request']['intent']['slots']['count']['value'] = '두 개'
+            rv = client.post('/', json=req)
+            self.assertEqual('200 OK', rv.status)
+
+        self.assertEqual(counter.call_count, 3)
+
+    def test_json_backend(self):
+        app = Flask('__TEST_JSON__')
+        app.config['CLOVA_JSON_BACKEND'] = 'not_a_backend'
+        clova = Clova(app=app, route="/")
+
+        @clova.launch
+        def launch():
+            session.sessionAttributes['lang'] = '한국어'
+            return statement(say.Korean('안녕하세요'))
+
+        req = {
+            "version": "0.1.0",
+            "session": {},
+            "context": {},
+            "request": {
+                "type": "LaunchRequest"
+            }
+        }
+        with app.test_client() as client:
+            rv = client.post('/', json=req)
+            self.assertEqual('200 OK', rv.status)
+            self.assertEqual(rv.get_json()['sessionAttributes'], {'lang': '한국어'})
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], '안녕하세요')
+
+        self.assertIn(clova.json_codec.name, ('orjson', 'ujson', 'json'))
+        self.assertEqual(Clova(json_backend='json').json_codec.name, 'json')
+
+        with self.app.app_context():
+            self.assertEqual(self.clova.json_codec.name, 'json')
+
+    def test_json_backends_accept_flask_json_values(self):
+        with self.app.app_context():
+            for values in ({1: 'a'}, {'day': datetime.date(2018, 5, 1)}, {'price': decimal.Decimal('1.5')}):
+                expected = json.loads(codec.FlaskJSONCodec.dumps(values))
+                for backend in ('orjson', 'ujson'):
+                    json_codec = codec.get_codec(backend)
+                    # ujson encodes Decimal natively, as a number
+                    if json_codec.name != backend or (backend == 'ujson' and 'price' in values):
+                        continue
+                    self.assertEqual(json.loads(json_codec.dumps(values)), expected)
+
+    def test_dbgdump(self):
+        @self.clova.launch
+        def launch():
+            return "ok"
+
+        @self.clova.session_ended
+        def session_ended():
+            raise ValueError('failed')
+
+        req = {
+            "version": "0.1.0",
+            "session": {},
+            "context": {},
+            "request": {
+                "type": "LaunchRequest"
+            }
+        }
+        clova_logger = logging.getLogger('flask_clova')
+        level = clova_logger.level
+        self.app.config['CLOVA_DEBUG_DUMP_ERRORS_ONLY'] = True
+        try:
+            with mock.patch('flask_clova.core.json') as json_mock, self.app.test_client() as client:
+                clova_logger.setLevel(logging.WARN)
+                client.post('/', json=req)
+                self.assertEqual(json_mock.dumps.call_count, 0)
+
+                clova_logger.setLevel(logging.DEBUG)
+                client.post('/', json=req)
+                self.assertEqual(json_mock.dumps.call_count, 0)
+
+                req['request']['type'] = 'SessionEndedRequest'
+                rv = client.post('/', json=req)
+                self.assertEqual(rv.status_code, 500)
+                self.assertEqual(json_mock.dumps.call_count, 1)
+        finally:
+            clova_logger.setLevel(level)
+
+    def test_multiple_blueprints(self):
+        app = Flask('__TEST_BLUEPRINTS__')
+        blueprints = {}
+        for name in ('first', 'second'):
+            blueprint = Blueprint(name, __name__, url_prefix='/' + name)
+            clova = Clova(blueprint=blueprint)
+
+            @clova.launch
+            def launch(clova=clova):
+                self.assertIs(find_clova(), clova)
+                self.assertEqual(request.type, 'LaunchRequest')
+                return "ok"
+
+            app.register_blueprint(blueprint)
+            blueprints[name] = clova
+
+        req = {
+            "version": "0.1.0",
+            "context": {},
+            "request": {
+                "type": "LaunchRequest"
+            }
+        }
+        with app.test_client() as client:
+            for name in ('first', 'second'):
+                rv = client.post('/' + name, json=req)
+                self.assertEqual('200 OK', rv.status)
+
+        with app.test_request_context('/second', method='POST'):
+            self.assertIs(find_clova(), blueprints['second'])
+
+    def test_async_handlers(self):
+        counter = mock.MagicMock()
+        @self.clova.on_session_started
+        async def session_started():
+            counter()
+
+        @self.clova.launch
+        async def launch():
+            counter()
+            return statement(say.Korean('시작'))
+
+        req = {
+            "version": "0.1.0",
+            "session": {"new": True},
+            "context": {},
+            "request": {
+                "type": "LaunchRequest"
+            }
+        }
+        with self.app.test_client() as client:
+            rv = client.post('/', json=req)
+            self.assertEqual('200 OK', rv.status)
+            self.assertTrue(rv.get_json()['response']['shouldEndSession'])
+
+        self.assertEqual(counter.call_count, 2)
+
+    def test_application_id_verification(self):
+        @self.clova.launch
+        def launch():
+            return "ok"
+
+        req = {
+            "version": "0.1.0",
+            "context": {
+                "System": {
+                    "application": {
+                        "applicationId": "com.example.extension"
+                    }
+                }
+            },
+            "request": {
+                "type": "LaunchRequest"
+            }
+        }
+        with self.app.test_client() as client:
+            self.app.config['CLOVA_APPLICATION_ID'] = 'com.example.extension'
+            self.assertEqual(client.post('/', json=req).status_code, 200)
+
+            # a single ID is not matched as a substring
+            self.app.config['CLOVA_APPLICATION_ID'] = 'com.example.extension.other'
+            self.assertEqual(client.post('/', json=req).status_code, 500)
+
+            allowed = ['com.example.other']
+            self.app.config['CLOVA_APPLICATION_ID'] = allowed
+            self.assertEqual(client.post('/', json=req).status_code, 500)
+
+            allowed.append('com.example.extension')
+            with self.app.app_context():
+                self.clova.refresh_application_ids()
+                self.assertEqual(self.clova.application_ids, frozenset(allowed))
+            self.assertEqual(client.post('/', json=req).status_code, 200)
+
+    def test_template_reload(self):
+        root_path = tempfile.mkdtemp()
+        template_path = os.path.join(root_path, 'templates.yaml')
+        with open(template_path, 'w') as f:
+            f.write('welcome: Hello {{ name }}\n')
+
+        app = Flask('__TEST_TEMPLATES__', root_path=root_path)
+        app.config['TEMPLATES_AUTO_RELOAD'] = True
+        Clova(app=app, route='/')
+
+        with app.app_context():
+            self.assertEqual(render_template('welcome', name='Clova'), 'Hello Clova')
+
+            with open(template_path, 'w') as f:
+                f.write('welcome: Bye {{ name }}\n')
+            os.utime(template_path, (0, 0))
+
+            app.config['CLOVA_TEMPLATE_RELOAD'] = False
+            self.assertEqual(render_template('welcome', name='Clova'), 'Hello Clova')
+
+            app.config['CLOVA_TEMPLATE_RELOAD'] = 60
+            self.assertEqual(render_template('welcome', name='Clova'), 'Bye Clova')
+
+            with open(template_path, 'w') as f:
+                f.write('welcome: Hi {{ name }}\n')
+            os.utime(template_path, (1, 1))
+            self.assertEqual(render_template('welcome', name='Clova'), 'Bye Clova')
+
+    def test_cache_response(self):
+        counter = mock.MagicMock()
+        @self.clova.intent('GuideIntent', cache_response=True)
+        def guide_intent():
+            counter()
+            session.sessionAttributes['guided'] = counter.call_count
+            return question(say.Korean('주사위 한 개 던져줘, 라고 시도해보세요.'))
+
+        req = {
+            "version": "0.1.0",
+            "session": {"sessionAttributes": {"count": 1}},
+            "context": {},
+            "request": {
+                "type": "IntentRequest",
+                "intent": {
+                    "name": "GuideIntent",
+                    "slots": {}
+                }
+            }
+        }
+        with self.app.test_client() as client:
+            first = client.post('/', json=req).get_json()
+            req['session']['sessionAttributes'] = {"count": 2}
+            second = client.post('/', json=req).get_json()
+
+        self.assertEqual(counter.call_count, 1)
+        self.assertEqual(first['response'], second['response'])
+        self.assertEqual(first['sessionAttributes'], {'count': 1, 'guided': 1})
+        self.assertEqual(second['sessionAttributes'], {'count': 2})
+
+        frozen = statement(say.Korean('종료합니다.')).freeze()
+        with self.assertRaises(TypeError):
+            frozen.add_speech(say.Korean('안녕'))
+
+    def test_request_state_in_thread(self):
+        seen = []
+        @self.clova.launch
+        def launch():
+            state = request_state()
+
+            def background():
+                with state.bind():
+                    seen.append((request.type, session.sessionAttributes['count']))
+
+            thread = threading.Thread(target=background)
+            thread.start()
+            thread.join()
+            return "ok"
+
+        req = {
+            "version": "0.1.0",
+            "session": {"sessionAttributes": {"count": 3}},
+            "context": {},
+            "request": {
+                "type": "LaunchRequest"
+            }
+        }
+        with self.app.test_client() as client:
+            client.post('/', json=req)
+
+        self.assertEqual(seen, [('LaunchRequest', 3)])
+
+    def test_dispatch_many(self):
+        @self.clova.intent('EchoIntent')
+        def echo_intent(word):
+            session.sessionAttributes['word'] = word
+            return statement(say.Korean(word))
+
+        @self.clova.session_ended
+        def end_session():
+            return "{}", 200
+
+        def payload(word):
+            return {
+                "version": "0.1.0",
+                "session": {"sessionAttributes": {}},
+                "context": {},
+                "request": {
+                    "type": "IntentRequest",
+                    "intent": {"name": "EchoIntent", "slots": {"word": {"name": "word", "value": word}}}
+                }
+            }
+
+        payloads = [payload('하나'), json.dumps(payload('둘')).encode('utf-8'),
+                    {"version": "0.1.0", "context": {}, "request": {"type": "SessionEndedRequest"}},
+                    {"version": "0.1.0", "context": {}, "request": {"type": "LaunchRequest"}}]
+        @self.clova.intent('TimedIntent', timeout=5)
+        def timed_intent():
+            return "", 202
+
+        payloads.append({"version": "0.1.0", "context": {},
+                         "request": {"type": "IntentRequest", "intent": {"name": "TimedIntent", "slots": {}}}})
+        # the parent's worker threads exist when the worker processes are forked
+        list(self.clova.dispatch_many(payloads[-1:]))
+
+        for processes in (None, 2):
+            responses = list(self.clova.dispatch_many(payloads, processes=processes))
+            self.assertEqual([status for status, _ in responses], [200, 200, 200, 400, 202])
+            bodies = [body for _, body in responses]
+            self.assertEqual(json.loads(bodies[0])['sessionAttributes'], {'word': '하나'})
+            self.assertEqual(json.loads(bodies[1])['response']['outputSpeech']['values']['value'], '둘')
+            self.assertEqual(bodies[2], b'{}')
+            self.assertEqual(bodies[3], b'')
+        self.clova.shutdown()
+
+        self.assertEqual(payloads[0]['session'], {"sessionAttributes": {}})
+
+    def test_tenants(self):
+        shopping = self.clova.tenant('com.example.shopping')
+        self.assertIs(self.clova.tenant('com.example.shopping'), shopping)
+
+        @shopping.launch
+        def shopping_launch():
+            return statement(say.Korean('쇼핑'))
+
+        @shopping.intent('OrderIntent')
+        def order(menu):
+            return statement(say.Korean(menu))
+
+        @self.clova.launch
+        def launch():
+            return statement(say.Korean('기본'))
+
+        def speech(application_id, request):
+            req = {
+                "version": "0.1.0",
+                "session": {},
+                "context": {"System": {"application": {"applicationId": application_id}}},
+                "request": request
+            }
+            with self.app.test_client() as client:
+                rv = client.post('/', json=req)
+            self.assertEqual(rv.status, '200 OK')
+            return rv.get_json()['response']['outputSpeech']['values']['value']
+
+        self.app.config['CLOVA_APPLICATION_ID'] = 'com.example.default'
+        launch_request = {"type": "LaunchRequest"}
+        self.assertEqual(speech('com.example.shopping', launch_request), '쇼핑')
+        self.assertEqual(speech('com.example.default', launch_request), '기본')
+        self.assertEqual(speech('com.example.shopping', {
+            "type": "IntentRequest",
+            "intent": {"name": "OrderIntent", "slots": {"menu": {"name": "menu", "value": "피자"}}}
+        }), '피자')
+
+    def test_response_compression(self):
+        @self.clova.launch
+        def launch():
+            return statement(say.Korean('주사위를 던집니다. ' * 100))
+
+        req = {"version": "0.1.0", "context": {}, "request": {"type": "LaunchRequest"}}
+        with self.app.test_client() as client:
+            rv = client.post('/', json=req, headers={'Accept-Encoding': 'gzip'})
+            self.assertNotIn('Content-Encoding', rv.headers)
+            self.assertEqual(rv.headers['Content-Length'], str(len(rv.data)))
+            self.assertEqual(rv.mimetype, 'application/json')
+            body = rv.data
+
+            self.app.config['CLOVA_COMPRESSION'] = 'gzip'
+            rv = client.post('/', json=req, headers={'Accept-Encoding': 'gzip, deflate'})
+            self.assertEqual(rv.headers['Content-Encoding'], 'gzip')
+            self.assertEqual(rv.headers['Vary'], 'Accept-Encoding')
+            self.assertEqual(rv.headers['Content-Length'], str(len(rv.data)))
+            self.assertEqual(gzip.decompress(rv.data), body)
+
+            rv = client.post('/', json=req)
+            self.assertNotIn('Content-Encoding', rv.headers)
+
+            self.app.config['CLOVA_COMPRESSION_MIN_SIZE'] = len(body) + 1
+            rv = client.post('/', json=req, headers={'Accept-Encoding': 'gzip'})
+            self.assertNotIn('Content-Encoding', rv.headers)
+
+    def test_event_request(self):
+        seen = []
+        done = threading.Event()
+
+        @self.clova.event('AudioPlayer', 'PlayStarted')
+        def play_started():
+            seen.append(('PlayStarted', request.event.payload.token))
+            return statement(say.Korean('재생을 시작했습니다.'))
+
+        @self.clova.event('AudioPlayer', 'ProgressReportIntervalPassed', background=True)
+        def progress():
+            seen.append(('ProgressReportIntervalPassed', request.event.payload.token, threading.current_thread().name))
+            self.clova.after_response(done.set)
+
+        def event(name):
+            return {
+                "version": "0.1.0",
+                "context": {},
+                "request": {
+                    "type": "EventRequest",
+                    "event": {"namespace": "AudioPlayer", "name": name, "payload": {"token": "song-1"}}
+                }
+            }
+
+        with self.app.test_client() as client:
+            rv = client.post('/', json=event('PlayStarted'))
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], '재생을 시작했습니다.')
+
+            progress_event = event('ProgressReportIntervalPassed')
+            progress_event['session'] = {'sessionAttributes': {'playing': 'song-1'}}
+            rv = client.post('/', json=progress_event)
+            self.assertEqual(rv.status, '200 OK')
+            self.assertEqual(rv.get_json()['response']['directives'], [])
+            self.assertEqual(rv.get_json()['sessionAttributes'], {'playing': 'song-1'})
+            self.assertTrue(done.wait(5))
+
+            rv = client.post('/', json=event('PlayFinished'))
+            self.assertEqual(rv.status, '400 BAD REQUEST')
+
+        self.assertEqual(seen[0], ('PlayStarted', 'song-1'))
+        self.assertEqual(seen[1][:2], ('ProgressReportIntervalPassed', 'song-1'))
+        self.assertTrue(seen[1][2].startswith('clova-worker'))
+
+    def test_after_response(self):
+        seen = []
+        done = threading.Event()
+
+        def record(name, suffix=''):
+            seen.append((name + suffix, request.type, threading.current_thread().name))
+            done.set()
+
+        @self.clova.launch
+        def launch():
+            self.clova.after_response(record, 'launch', suffix='!')
+            self.assertEqual(seen, [])
+            return statement(say.Korean('안녕'))
+
+        req = {"version": "0.1.0", "context": {}, "request": {"type": "LaunchRequest"}}
+        with self.app.test_client() as client:
+            rv = client.post('/', json=req)
+            self.assertEqual(rv.status, '200 OK')
+        self.assertTrue(done.wait(5))
+        self.clova.shutdown()
+
+        self.assertEqual(seen[0][:2], ('launch!', 'LaunchRequest'))
+        self.assertTrue(seen[0][2].startswith('clova-worker'))
+        self.assertIsNone(self.clova._executor)
+
+    def test_handler_timeout(self):
+        release = threading.Event()
+        timeouts = []
+        self.clova.on_timeout(lambda *args: timeouts.append(args))
+
+        @self.clova.intent('SlowIntent', timeout=0.05, fallback=statement(say.Korean('잠시 후 다시 시도해주세요.')))
+        def slow_intent():
+            release.wait(5)
+            return statement(say.Korean('늦었습니다.'))
+
+        @self.clova.intent('FastIntent', timeout=5)
+        def fast_intent():
+            return statement(say.Korean(request.intent.name))
+
+        @self.clova.launch
+        def launch():
+            release.wait(5)
+            return statement(say.Korean('안녕'))
+
+        def intent(name):
+            return {
+                "version": "0.1.0",
+                "context": {},
+                "request": {"type": "IntentRequest", "intent": {"name": name, "slots": {}}}
+            }
+
+        with self.app.test_client() as client:
+            rv = client.post('/', json=intent('SlowIntent'))
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], '잠시 후 다시 시도해주세요.')
+
+            rv = client.post('/', json=intent('FastIntent'))
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], 'FastIntent')
+
+            self.app.config['CLOVA_HANDLER_TIMEOUT'] = 0.05
+            rv = client.post('/', json={"version": "0.1.0", "context": {}, "request": {"type": "LaunchRequest"}})
+            self.assertEqual(rv.status, '504 GATEWAY TIMEOUT')
+
+        release.set()
+        self.clova.shutdown()
+        self.assertEqual(timeouts, [('IntentRequest', 'SlowIntent', 0.05), ('LaunchRequest', None, 0.05)])
+
+    def test_timed_handler_request_context(self):
+        release = threading.Event()
+
+        @self.clova.intent('HeaderIntent')
+        def header_intent():
+            return statement(say.Korean(flask_request.headers['X-Device']))
+
+        @self.clova.intent('FailingIntent', timeout=0.05)
+        def failing_intent():
+            release.wait(5)
+            raise ValueError('late failure')
+
+        def intent(name):
+            return {
+                "version": "0.1.0",
+                "context": {},
+                "request": {"type": "IntentRequest", "intent": {"name": name, "slots": {}}}
+            }
+
+        self.app.config['CLOVA_HANDLER_TIMEOUT'] = 1
+        with self.app.test_client() as client:
+            rv = client.post('/', json=intent('HeaderIntent'), headers={'X-Device': 'speaker'})
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], 'speaker')
+
+            rv = client.post('/', json=intent('FailingIntent'))
+            self.assertEqual(rv.status, '504 GATEWAY TIMEOUT')
+
+        with self.assertLogs('flask_clova', logging.ERROR) as logs:
+            release.set()
+            self.clova.shutdown()
+        self.assertIn('Handler failed after timing out', logs.output[0])
+
+    def test_timed_out_handler_writes_are_dropped(self):
+        self.clova.session_store = MemorySessionStore()
+        deadline_passed = threading.Event()
+        finished = threading.Event()
+        dropped = mock.MagicMock()
+
+        @self.clova.intent('SlowIntent', timeout=0.05, fallback=statement(say.Korean('잠시 후 다시 시도해주세요.')))
+        def slow_intent():
+            deadline_passed.wait(5)
+            for i in range(100):
+                session.sessionAttributes['key{}'.format(i)] = i
+            self.clova.after_response(dropped)
+            finished.set()
+            return statement(say.Korean('늦었습니다.'))
+
+        @self.clova.intent('FastIntent', timeout=5)
+        def fast_intent():
+            session.sessionAttributes['fast'] = True
+            return statement(say.Korean('빠릅니다.'))
+
+        def intent(name):
+            return {
+                "version": "0.1.0",
+                "session": {"sessionId": "session-1", "sessionAttributes": {}},
+                "context": {},
+                "request": {"type": "IntentRequest", "intent": {"name": name, "slots": {}}}
+            }
+
+        release = threading.Event()
+        with self.app.app_context():
+            for _ in range(8):
+                # background work does not delay handlers with a timeout
+                self.clova.executor.submit(release.wait, 5)
+
+        with self.app.test_client() as client:
+            rv = client.post('/', json=intent('SlowIntent'))
+            deadline_passed.set()
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], '잠시 후 다시 시도해주세요.')
+            self.assertTrue(finished.wait(5))
+            self.assertIsNone(self.clova.session_store.load('session-1'))
+
+            rv = client.post('/', json=intent('FastIntent'))
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], '빠릅니다.')
+            self.assertEqual(json.loads(self.clova.session_store.load('session-1')), {'fast': True})
+
+        release.set()
+        self.clova.shutdown()
+        self.assertEqual(dropped.call_count, 0)
+
+    def test_prefetch(self):
+        calls = []
+
+        recorded = threading.Event()
+
+        @self.clova.prefetch
+        def profile():
+            calls.append(threading.current_thread().name)
+            session.sessionAttributes['prefetched'] = True
+            self.clova.after_response(recorded.set)
+            return {'user': context.System.user.userId}
+
+        @self.clova.launch
+        def launch():
+            return statement(say.Korean('안녕'))
+
+        @self.clova.intent('ProfileIntent')
+        def profile_intent():
+            return statement(say.Korean(self.clova.prefetched('profile', timeout=5)['user']))
+
+        def req(session_id, request_body, new=False):
+            return {
+                "version": "0.1.0",
+                "session": {"sessionId": session_id, "new": new},
+                "context": {"System": {"user": {"userId": "user-1"}}},
+                "request": request_body
+            }
+        intent = {"type": "IntentRequest", "intent": {"name": "ProfileIntent", "slots": {}}}
+
+        with self.app.test_client() as client:
+            rv = client.post('/', json=req('session-1', {"type": "LaunchRequest"}, new=True))
+            self.assertNotIn('prefetched', rv.get_json()['sessionAttributes'])
+            rv = client.post('/', json=req('session-1', intent))
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], 'user-1')
+            self.assertEqual(len(calls), 1)
+            self.assertTrue(recorded.wait(5))
+            self.assertTrue(calls[0].startswith('clova-worker'))
+
+            rv = client.post('/', json=req('session-2', intent))
+            self.assertEqual(rv.get_json()['response']['outputSpeech']['values']['value'], 'user-1')
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(calls[1], threading.current_thread().name)
+
+            client.post('/', json=req('session-1', {"type": "SessionEndedRequest"}))
+            self.assertNotIn('session-1', self.clova._prefetched)
+
+        self.clova.shutdown()
+
+    def test_stage_timing(self):
+        timings = []
+        @self.clova.on_timing
+        def timing(stage, duration_ns, request_type, intent_name):
+            timings.append((stage, request_type, intent_name))
+            self.assertGreaterEqual(duration_ns, 0)
+
+        @self.clova.intent('GuideIntent')
+        def guide_intent():
+            return statement(say.Korean('안녕'))
+
+        req = {
+            "version": "0.1.0",
+            "session": {"new": False},
+            "context": {},
+            "request": {
+                "type": "IntentRequest",
+                "intent": {"name": "GuideIntent", "slots": {}}
+            }
+        }
+        with self.app.test_client() as client:
+            rv = client.post('/', json=req)
+            self.assertNotIn('Server-Timing', rv.headers)
+
+            self.app.config['CLOVA_SERVER_TIMING'] = True
+            rv = client.post('/', json=req)
+
+        stages = [stage for stage, _, _ in timings[:len(timings) // 2]]
+        self.assertEqual(stages, ['verify', 'parse', 'wrap', 'dispatch', 'handler', 'render'])
+        self.assertEqual(set(timings), {(stage, 'IntentRequest', 'GuideIntent') for stage in stages})
+        self.assertEqual(
+            [part.split(';')[0] for part in rv.headers['Server-Timing'].split(', ')],
+            stages
+        )
+
     def test_end_session(self):
         counter = mock.MagicMock()
         @self.clova.session_ended
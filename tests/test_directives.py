@@ -0,0 +1,77 @@
+import json
+import unittest
+
+from flask import Flask
+from flask_clova import Clova, AudioPlayer, directive, statement, say, codec
+from flask_clova.directives import Directive, progress_report
+
+
+class DirectiveTest(unittest.TestCase):
+    def test_prebuilt_directives(self):
+        self.assertIs(directive.open_mike(), directive.open_mike())
+        self.assertIs(AudioPlayer.stop(), AudioPlayer.stop())
+        self.assertEqual(AudioPlayer.pause().to_dict(), {
+            "header": {"namespace": "PlaybackController", "name": "Pause"},
+            "payload": {}
+        })
+        with self.assertRaises(AttributeError):
+            directive.open_mike().name = 'Other'
+
+    def test_mapping_access(self):
+        open_mike = directive.open_mike()
+        self.assertEqual(open_mike['header']['name'], 'KeepConversation')
+        self.assertTrue(open_mike['payload']['explicit'])
+        self.assertEqual(open_mike, {"header": {"name": "KeepConversation", "namespace": "Clova"},
+                                     "payload": {"explicit": True}})
+        self.assertEqual(dict(open_mike)['payload'], {"explicit": True})
+
+        with self.assertRaises(TypeError):
+            open_mike.payload['explicit'] = False
+        with self.assertRaises(TypeError):
+            open_mike['payload']['explicit'] = False
+        open_mike.to_dict()['payload']['explicit'] = False
+        self.assertEqual(directive.open_mike().to_dict()['payload'], {"explicit": True})
+
+        payload = {'audioItem': {'audioItemId': 'song-1'}}
+        play = Directive('AudioPlayer', 'Play', payload)
+        payload['audioItem']['audioItemId'] = 'changed'
+        self.assertEqual(play['payload']['audioItem']['audioItemId'], 'song-1')
+
+    def test_encode(self):
+        play = AudioPlayer.play('https://example.com/song.mp3', token='song-1', title='노래',
+                                progress=progress_report(interval=60000))
+        for json_codec in (codec.FlaskJSONCodec(), codec.get_codec()):
+            for value in (play, AudioPlayer.resume(), directive.open_mike()):
+                fresh = Directive(value.namespace, value.name, value.payload)
+                self.assertEqual(json.loads(fresh._encode(json_codec.dumps)), value.to_dict())
+
+        to_dict = play.to_dict()
+        to_dict['payload']['audioItem']['titleText'] = 'changed'
+        self.assertEqual(play.payload['audioItem']['titleText'], '노래')
+
+    def test_stream_cache(self):
+        app = Flask(__name__)
+        clova = Clova(app, '/')
+
+        @clova.intent('PlayIntent')
+        def play_intent():
+            return statement(say.Korean('재생합니다.')).add_directive(
+                AudioPlayer.play('https://example.com/song.mp3', token='song-1', artist='가수')
+            )
+
+        req = {
+            "version": "0.1.0",
+            "context": {},
+            "request": {"type": "IntentRequest", "intent": {"name": "PlayIntent", "slots": {}}}
+        }
+        with app.test_client() as client:
+            response = client.post('/', json=req).get_json()['response']
+
+        play = response['directives'][0]
+        self.assertEqual(play['header'], {'namespace': 'AudioPlayer', 'name': 'Play'})
+        self.assertEqual(play['payload']['audioItem']['stream']['token'], 'song-1')
+        self.assertEqual(clova.stream_cache.get('song-1'), play['payload']['audioItem'])
+
+
+if __name__ == '__main__':
+    unittest.main()
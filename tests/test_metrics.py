@@ -0,0 +1,42 @@
+import unittest
+
+from flask_clova.metrics import StageTimer, TimingHistogram
+
+
+class TestStageTimer(unittest.TestCase):
+    def test_mark(self):
+        timer = StageTimer()
+        timer.mark('parse')
+        timer.mark('verify')
+        timer.mark('parse')
+
+        self.assertEqual(list(timer.stages), ['parse', 'verify'])
+        self.assertTrue(all(duration >= 0 for duration in timer.stages.values()))
+
+
+class TestTimingHistogram(unittest.TestCase):
+    def test_render(self):
+        histogram = TimingHistogram(buckets=(0.001, 0.01))
+        histogram('handler', 500000, 'IntentRequest', 'OrderIntent')
+        histogram('handler', 5000000, 'IntentRequest', 'OrderIntent')
+        histogram('handler', 50000000, 'IntentRequest', 'OrderIntent')
+        histogram('parse', 1000, 'LaunchRequest', None)
+
+        lines = histogram.render().splitlines()
+        self.assertEqual(lines[1], '# TYPE clova_stage_duration_seconds histogram')
+
+        labels = 'stage="handler",request_type="IntentRequest",intent="OrderIntent"'
+        self.assertIn('clova_stage_duration_seconds_bucket{%s,le="0.001"} 1' % labels, lines)
+        self.assertIn('clova_stage_duration_seconds_bucket{%s,le="0.01"} 2' % labels, lines)
+        self.assertIn('clova_stage_duration_seconds_bucket{%s,le="+Inf"} 3' % labels, lines)
+        self.assertIn('clova_stage_duration_seconds_count{%s} 3' % labels, lines)
+        self.assertIn('clova_stage_duration_seconds_count{stage="parse",request_type="LaunchRequest",intent=""} 1', lines)
+
+    def test_escape_labels(self):
+        histogram = TimingHistogram()
+        histogram.observe('handler', 0.1, 'IntentRequest', 'Say"Hi"')
+        self.assertIn('intent="Say\\"Hi\\""', histogram.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
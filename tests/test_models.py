@@ -0,0 +1,68 @@
+import json
+import unittest
+
+from flask_clova import codec, statement, question, say, directive
+from flask_clova.models import _Field
+
+
+class FieldTest(unittest.TestCase):
+    def setUp(self):
+        self.payload = {
+            "version": "0.1.0",
+            "session": {
+                "sessionAttributes": {"count": 1}
+            },
+            "request": {
+                "type": "IntentRequest",
+                "intent": {"name": "test_intent", "slots": None}
+            }
+        }
+
+    def test_attribute_and_key_access(self):
+        field = _Field(self.payload)
+        self.assertEqual(field.request.type, field['request']['type'])
+        self.assertEqual(field.request.intent.name, 'test_intent')
+        self.assertIsNone(field.request.intent.slots)
+        self.assertIsNone(field.context)
+        self.assertIsNone(field.request.missing)
+
+    def test_nested_fields_are_wrapped_once(self):
+        field = _Field(self.payload)
+        self.assertIsInstance(field.session, _Field)
+        self.assertIs(field.session, field['session'])
+        self.assertIs(field.session, field.get('session'))
+
+        field.session.sessionAttributes.count = 2
+        self.assertEqual(field.session.sessionAttributes, {'count': 2})
+        self.assertEqual(field, dict(self.payload, session={'sessionAttributes': {'count': 2}}))
+
+    def test_payload_is_not_mutated(self):
+        field = _Field(self.payload)
+        field.session.sessionAttributes['count'] = 2
+        field.request.new = True
+        self.assertIs(type(self.payload['session']), dict)
+        self.assertNotIn('new', self.payload['request'])
+
+
+class ResponseTest(unittest.TestCase):
+    def test_speech_is_immutable(self):
+        speech = say.Korean('안녕하세요')
+        with self.assertRaises(AttributeError):
+            speech.value = 'hello'
+        self.assertEqual(speech, say.Korean('안녕하세요'))
+        self.assertEqual(speech.render_template(), {'type': 'PlainText', 'lang': 'ko', 'value': '안녕하세요'})
+        self.assertEqual(say.Link('http://a.b/c.mp3').render_template(),
+                         {'type': 'URL', 'lang': '', 'value': 'http://a.b/c.mp3'})
+
+    def test_encode_matches_response_dict(self):
+        responses = [
+            statement(say.Korean('안녕하세요')),
+            statement(say.Korean('주사위를 던집니다.'))
+                .add_speech(say.Link('http://a.b/"dice".mp3'))
+                .add_speech(say.English('done'))
+                .add_directive(directive.open_mike()),
+            question(say.English('Hello')).reprompt(say.Korean('여보세요?')).add_can_fulfill(True, 0.5),
+        ]
+        for json_codec in (codec.FlaskJSONCodec(), codec.get_codec()):
+            for response in responses:
+                self.assertEqual(json.loads(response._encode(json_codec.dumps).decode('utf-8')), response._response)
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+import mock
+from flask import Flask
+from flask_clova import Clova, session, question, say
+from flask_clova.sessions import MemorySessionStore, SQLiteSessionStore
+
+
+def intent_request(name, session_id='session-1'):
+    return {
+        "version": "0.1.0",
+        "session": {
+            "new": False,
+            "sessionId": session_id,
+            "sessionAttributes": {"sessionRef": session_id}
+        },
+        "context": {},
+        "request": {
+            "type": "IntentRequest",
+            "intent": {"name": name, "slots": {}}
+        }
+    }
+
+
+class SessionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask('__TEST_SESSIONS__')
+        self.store = MemorySessionStore()
+        self.clova = Clova(app=self.app, route='/', session_store=self.store)
+
+        @self.clova.intent('CountIntent')
+        def count():
+            session.sessionAttributes['count'] = session.sessionAttributes.get('count', 0) + 1
+            return question(say.Korean(str(session.sessionAttributes['count'])))
+
+        @self.clova.intent('ReadIntent')
+        def read():
+            return question(say.Korean(str(session.sessionAttributes.get('count'))))
+
+    def _speech(self, rv):
+        return rv.get_json()['response']['outputSpeech']['values']['value']
+
+    def test_attributes_are_kept_on_the_server(self):
+        with self.app.test_client() as client:
+            rv = client.post('/', json=intent_request('CountIntent'))
+            self.assertEqual(rv.get_json()['sessionAttributes'], {'sessionRef': 'session-1'})
+            client.post('/', json=intent_request('CountIntent'))
+            self.assertEqual(self._speech(client.post('/', json=intent_request('ReadIntent'))), '2')
+            self.assertEqual(self._speech(client.post('/', json=intent_request('ReadIntent', 'session-2'))), 'None')
+
+            req = intent_request('CountIntent')
+            req['request'] = {'type': 'SessionEndedRequest'}
+            client.post('/', json=req)
+            self.assertIsNone(self.store.load('session-1'))
+
+    def test_unchanged_attributes_are_not_saved(self):
+        with self.app.test_client() as client:
+            client.post('/', json=intent_request('CountIntent'))
+            with mock.patch.object(self.store, 'save') as save:
+                client.post('/', json=intent_request('ReadIntent'))
+                self.assertEqual(save.call_count, 0)
+                client.post('/', json=intent_request('CountIntent'))
+                self.assertEqual(save.call_count, 1)
+
+    def test_new_sessions_without_attributes_are_not_saved(self):
+        with self.app.test_client() as client:
+            with mock.patch.object(self.store, 'save') as save:
+                client.post('/', json=intent_request('ReadIntent', 'session-3'))
+                self.assertEqual(save.call_count, 0)
+
+
+class SQLiteSessionStoreTest(unittest.TestCase):
+    def test_write_behind(self):
+        path = os.path.join(tempfile.mkdtemp(), 'sessions.db')
+        store = SQLiteSessionStore(path, write_behind=True)
+        store.save('session-1', b'{"count":1}')
+        self.assertEqual(store.load('session-1'), b'{"count":1}')
+        store.flush()
+
+        self.assertEqual(SQLiteSessionStore(path).load('session-1'), b'{"count":1}')
+        store.delete('session-1')
+        store.flush()
+        self.assertIsNone(SQLiteSessionStore(path).load('session-1'))
+
+    def test_expired_sessions_are_purged(self):
+        path = os.path.join(tempfile.mkdtemp(), 'sessions.db')
+        store = SQLiteSessionStore(path, ttl=-1, purge_interval=0)
+        store.save('session-1', b'{"count":1}')
+        self.assertIsNone(store.load('session-1'))
+        store.save('session-2', b'{"count":2}')
+
+        rows = store._connection().execute('SELECT session_id FROM clova_sessions').fetchall()
+        self.assertEqual(rows, [('session-2',)])
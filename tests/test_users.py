@@ -0,0 +1,63 @@
+import unittest
+
+import mock
+from flask import Flask
+from flask_clova import Clova
+
+
+def launch_request(user_id, access_token):
+    return {
+        "version": "0.1.0",
+        "session": {},
+        "context": {
+            "System": {
+                "user": {"userId": user_id, "accessToken": access_token}
+            }
+        },
+        "request": {"type": "LaunchRequest"}
+    }
+
+
+class UserCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask('__TEST_USERS__')
+        self.clova = Clova(app=self.app, route='/')
+        self.loader = mock.MagicMock(side_effect=lambda user_id: {'name': user_id})
+        self.clova.user_cache.loader(self.loader)
+
+        @self.clova.launch
+        def launch():
+            return self.clova.user_cache.get()['name']
+
+    def test_loader_is_called_once_per_user(self):
+        with self.app.test_client() as client:
+            for _ in range(3):
+                self.assertEqual(client.post('/', json=launch_request('V0qe', 'token')).data, b'V0qe')
+            self.assertEqual(client.post('/', json=launch_request('other', 'token')).data, b'other')
+
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_access_token_invalidates(self):
+        with self.app.test_client() as client:
+            client.post('/', json=launch_request('V0qe', 'token'))
+            client.post('/', json=launch_request('V0qe', 'relinked'))
+            client.post('/', json=launch_request('V0qe', 'relinked'))
+
+        self.assertEqual(self.loader.call_count, 2)
+
+        self.clova.user_cache.invalidate('V0qe')
+        with self.app.test_client() as client:
+            client.post('/', json=launch_request('V0qe', 'relinked'))
+
+        self.assertEqual(self.loader.call_count, 3)
+
+    def test_requests_without_user_are_not_cached(self):
+        user_cache = self.clova.user_cache
+        with self.app.test_request_context('/', method='POST'):
+            self.clova._bind_request(launch_request(None, None))
+            user_cache.set({'name': 'anonymous'})
+            user_cache.invalidate()
+            self.assertIsNone(user_cache.get())
+
+        self.assertEqual(len(user_cache.store), 0)
+        self.assertEqual(self.loader.call_count, 0)
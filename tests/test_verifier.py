@@ -0,0 +1,77 @@
+import base64
+import unittest
+
+import mock
+from flask import Flask
+from flask_clova import Clova
+from flask_clova import verifier
+
+try:
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+except ImportError:
+    rsa = None
+
+
+def generate_key():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+    pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_key, pem
+
+
+def sign(private_key, body):
+    signature = private_key.sign(body, padding.PKCS1v15(), hashes.SHA256())
+    return base64.b64encode(signature).decode('ascii')
+
+
+@unittest.skipIf(rsa is None, "cryptography is not installed")
+class SignatureVerifierTest(unittest.TestCase):
+    def setUp(self):
+        self.private_key, self.pem = generate_key()
+        self.fetcher = mock.MagicMock(return_value=self.pem)
+
+    def test_verify(self):
+        signature_verifier = verifier.SignatureVerifier(fetcher=self.fetcher)
+        body = b'{"version": "0.1.0"}'
+        signature = sign(self.private_key, body)
+
+        signature_verifier.verify(body, signature)
+        signature_verifier.verify(body, signature)
+        self.assertEqual(self.fetcher.call_count, 1)
+
+        with self.assertRaises(verifier.VerificationError):
+            signature_verifier.verify(body + b' ', signature)
+        with self.assertRaises(verifier.VerificationError):
+            signature_verifier.verify(body, None)
+        with self.assertRaises(verifier.VerificationError):
+            signature_verifier.verify(body, sign(generate_key()[0], body))
+
+    def test_verified_digests_skip_rsa(self):
+        signature_verifier = verifier.SignatureVerifier(fetcher=self.fetcher)
+        body = b'{"version": "0.1.0"}'
+        signature = sign(self.private_key, body)
+        signature_verifier.verify(body, signature)
+
+        with mock.patch.object(signature_verifier._public_key.__class__, 'verify') as rsa_verify:
+            signature_verifier.verify(body, signature)
+            self.assertEqual(rsa_verify.call_count, 0)
+
+    def test_clova_request(self):
+        app = Flask('__TEST_SIGNATURE__')
+        app.config['CLOVA_VERIFY_SIGNATURE'] = True
+        clova = Clova(app=app, route='/', signature_verifier=verifier.SignatureVerifier(fetcher=self.fetcher))
+
+        @clova.launch
+        def launch():
+            return "ok"
+
+        body = b'{"version": "0.1.0", "context": {}, "request": {"type": "LaunchRequest"}}'
+        with app.test_client() as client:
+            rv = client.post('/', data=body, headers={'SignatureCEK': sign(self.private_key, body)})
+            self.assertEqual(rv.status_code, 200)
+
+            rv = client.post('/', data=body, headers={'SignatureCEK': sign(generate_key()[0], body)})
+            self.assertEqual(rv.status_code, 500)
@@ -0,0 +1,35 @@
+import threading
+import unittest
+
+from flask_clova.workers import BoundedExecutor
+
+
+class BoundedExecutorTest(unittest.TestCase):
+    def test_submit(self):
+        executor = BoundedExecutor(max_workers=2)
+        futures = [executor.submit(pow, n, 2) for n in range(10)]
+        self.assertEqual([future.result() for future in futures], [n ** 2 for n in range(10)])
+        executor.shutdown()
+
+    def test_caller_runs_when_full(self):
+        executor = BoundedExecutor(max_workers=1, queue_size=1)
+        release = threading.Event()
+        blocked = executor.submit(release.wait, 5)
+
+        future = executor.submit(threading.current_thread)
+        self.assertIs(future.result(), threading.current_thread())
+
+        release.set()
+        self.assertTrue(blocked.result())
+        executor.shutdown()
+
+    def test_failures_are_logged(self):
+        executor = BoundedExecutor(max_workers=1)
+        with self.assertLogs('flask_clova', 'ERROR'):
+            future = executor.submit(int, 'x')
+            executor.shutdown()
+        self.assertIsInstance(future.exception(), ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()